@@ -32,9 +32,6 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
-    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
-    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
 
     # Create registered_mcps table
     op.create_table(
@@ -50,8 +47,6 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_registered_mcps_id'), 'registered_mcps', ['id'], unique=False)
-    op.create_index(op.f('ix_registered_mcps_name'), 'registered_mcps', ['name'], unique=True)
 
     # Create conversations table
     op.create_table(
@@ -65,8 +60,6 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_conversations_id'), 'conversations', ['id'], unique=False)
-    op.create_index(op.f('ix_conversations_user_id'), 'conversations', ['user_id'], unique=False)
 
     # Create messages table
     op.create_table(
@@ -80,8 +73,6 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index(op.f('ix_messages_conversation_id'), 'messages', ['conversation_id'], unique=False)
-    op.create_index(op.f('ix_messages_id'), 'messages', ['id'], unique=False)
 
     # Create user_mcps table
     op.create_table(
@@ -97,6 +88,18 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('user_id', 'mcp_id', name='uix_user_mcp')
     )
+    # Create all indexes after the tables so the data-definition work
+    # runs first and the index builds happen together at the end of the
+    # single migration transaction
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_index(op.f('ix_registered_mcps_id'), 'registered_mcps', ['id'], unique=False)
+    op.create_index(op.f('ix_registered_mcps_name'), 'registered_mcps', ['name'], unique=True)
+    op.create_index(op.f('ix_conversations_id'), 'conversations', ['id'], unique=False)
+    op.create_index(op.f('ix_conversations_user_id'), 'conversations', ['user_id'], unique=False)
+    op.create_index(op.f('ix_messages_conversation_id'), 'messages', ['conversation_id'], unique=False)
+    op.create_index(op.f('ix_messages_id'), 'messages', ['id'], unique=False)
     op.create_index(op.f('ix_user_mcps_id'), 'user_mcps', ['id'], unique=False)
 
 
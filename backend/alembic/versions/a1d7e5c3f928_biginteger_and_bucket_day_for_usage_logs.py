@@ -0,0 +1,50 @@
+"""widen usage log pk and add generated bucket_day column
+
+Revision ID: a1d7e5c3f928
+Revises: f6c9d24e80b5
+Create Date: 2025-03-14 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1d7e5c3f928'
+down_revision: Union[str, None] = 'f6c9d24e80b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A busy proxy exhausts a 32-bit sequence; widen before it happens
+    op.alter_column(
+        'mcp_usage_logs',
+        'id',
+        type_=sa.BigInteger(),
+        existing_type=sa.Integer(),
+    )
+    # Stored generated day bucket: rollups group on a plain DATE column
+    # instead of computing date_trunc per row
+    op.execute("""
+        ALTER TABLE mcp_usage_logs
+        ADD COLUMN bucket_day date
+        GENERATED ALWAYS AS ((timestamp AT TIME ZONE 'UTC')::date) STORED
+    """)
+    op.create_index(
+        'ix_mcpusage_mcp_bucket_day',
+        'mcp_usage_logs',
+        ['mcp_id', 'bucket_day'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mcpusage_mcp_bucket_day', table_name='mcp_usage_logs')
+    op.drop_column('mcp_usage_logs', 'bucket_day')
+    op.alter_column(
+        'mcp_usage_logs',
+        'id',
+        type_=sa.Integer(),
+        existing_type=sa.BigInteger(),
+    )
@@ -0,0 +1,62 @@
+"""switch queried mcp json columns to jsonb with gin indexes
+
+Revision ID: a8d51c7e93f4
+Revises: f3a1c9e42b17
+Create Date: 2025-03-10 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d51c7e93f4'
+down_revision: Union[str, None] = 'f3a1c9e42b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # capabilities and supported_models are the only JSON columns we filter
+    # on (containment in get_multi_with_filters); JSONB enables GIN support
+    op.alter_column(
+        'mcps', 'capabilities',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using='capabilities::jsonb',
+    )
+    op.alter_column(
+        'mcps', 'supported_models',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using='supported_models::jsonb',
+    )
+    op.create_index(
+        'ix_mcps_capabilities_gin',
+        'mcps',
+        ['capabilities'],
+        postgresql_using='gin',
+        postgresql_ops={'capabilities': 'jsonb_path_ops'},
+    )
+    op.create_index(
+        'ix_mcps_supported_models_gin',
+        'mcps',
+        ['supported_models'],
+        postgresql_using='gin',
+        postgresql_ops={'supported_models': 'jsonb_path_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mcps_supported_models_gin', table_name='mcps')
+    op.drop_index('ix_mcps_capabilities_gin', table_name='mcps')
+    op.alter_column(
+        'mcps', 'supported_models',
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        postgresql_using='supported_models::json',
+    )
+    op.alter_column(
+        'mcps', 'capabilities',
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        postgresql_using='capabilities::json',
+    )
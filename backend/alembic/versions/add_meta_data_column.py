@@ -19,24 +19,13 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    # Add meta_data column to conversations table
-    op.add_column('conversations', sa.Column('meta_data', postgresql.JSON(astext_type=sa.Text()), nullable=True))
-    
-    # Add meta_data column to messages table if it doesn't exist
-    # Note: In the table structure we saw, it seems messages may have a 'message_metadata' column instead of 'meta_data'
-    # Let's check if the column exists first and add it if needed
-    try:
-        op.add_column('messages', sa.Column('meta_data', postgresql.JSON(astext_type=sa.Text()), nullable=True))
-    except Exception as e:
-        print(f"Could not add meta_data column to messages table, it might already exist: {e}")
+    # One ALTER TABLE per table; IF NOT EXISTS covers databases where the
+    # messages column was already added out-of-band (some deployments have
+    # a 'message_metadata' column instead)
+    op.execute("ALTER TABLE conversations ADD COLUMN IF NOT EXISTS meta_data JSON")
+    op.execute("ALTER TABLE messages ADD COLUMN IF NOT EXISTS meta_data JSON")
 
 
 def downgrade() -> None:
-    # Remove meta_data column from conversations table
-    op.drop_column('conversations', 'meta_data')
-    
-    # Remove meta_data column from messages table if we added it
-    try:
-        op.drop_column('messages', 'meta_data')
-    except Exception as e:
-        print(f"Could not drop meta_data column from messages table: {e}") 
\ No newline at end of file
+    op.execute("ALTER TABLE messages DROP COLUMN IF EXISTS meta_data")
+    op.execute("ALTER TABLE conversations DROP COLUMN IF EXISTS meta_data") 
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""move jsonb defaults server-side and make them non-null
+
+Revision ID: b7e2f94c1a06
+Revises: a1d7e5c3f928
+Create Date: 2025-03-14 10:25:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2f94c1a06'
+down_revision: Union[str, None] = 'a1d7e5c3f928'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = (
+    ('messages', 'meta_data'),
+    ('conversations', 'meta_data'),
+    ('users', 'preferences'),
+)
+
+
+def upgrade() -> None:
+    for table, column in _COLUMNS:
+        op.execute(f"UPDATE {table} SET {column} = '{{}}' WHERE {column} IS NULL")
+        op.alter_column(
+            table,
+            column,
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        )
+
+
+def downgrade() -> None:
+    for table, column in _COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            server_default=None,
+            nullable=True,
+        )
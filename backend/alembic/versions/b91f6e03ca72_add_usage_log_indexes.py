@@ -0,0 +1,47 @@
+"""add covering and partial indexes for usage log aggregation
+
+Revision ID: b91f6e03ca72
+Revises: e5c8a2f7d410
+Create Date: 2025-03-12 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b91f6e03ca72'
+down_revision: Union[str, None] = 'e5c8a2f7d410'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stats and usage queries filter on (mcp_id, timestamp) and
+    # (user_id, timestamp); INCLUDE keeps the aggregate columns in the
+    # index so those scans stay index-only
+    op.create_index(
+        'ix_mcp_usage_logs_mcp_ts',
+        'mcp_usage_logs',
+        ['mcp_id', sa.text('timestamp DESC')],
+        postgresql_include=['tokens_used', 'error'],
+    )
+    # Errors are rare; a partial index keeps the error-rate lookup tiny
+    op.create_index(
+        'ix_mcp_usage_logs_errors',
+        'mcp_usage_logs',
+        ['mcp_id'],
+        postgresql_where=sa.text('error = true'),
+    )
+    op.create_index(
+        'ix_mcp_usage_logs_user_ts',
+        'mcp_usage_logs',
+        ['user_id', sa.text('timestamp DESC')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mcp_usage_logs_user_ts', table_name='mcp_usage_logs')
+    op.drop_index('ix_mcp_usage_logs_errors', table_name='mcp_usage_logs')
+    op.drop_index('ix_mcp_usage_logs_mcp_ts', table_name='mcp_usage_logs')
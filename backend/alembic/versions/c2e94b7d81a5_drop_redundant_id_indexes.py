@@ -0,0 +1,28 @@
+"""drop redundant single-column id indexes
+
+Revision ID: c2e94b7d81a5
+Revises: a8d51c7e93f4
+Create Date: 2025-03-10 11:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e94b7d81a5'
+down_revision: Union[str, None] = 'a8d51c7e93f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The primary key already provides a unique B-tree on id; these
+    # duplicates only added write amplification on every INSERT
+    op.drop_index('ix_messages_id', table_name='messages')
+    op.drop_index('ix_conversations_id', table_name='conversations')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_conversations_id'), 'conversations', ['id'], unique=False)
+    op.create_index(op.f('ix_messages_id'), 'messages', ['id'], unique=False)
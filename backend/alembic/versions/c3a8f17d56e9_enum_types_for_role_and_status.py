@@ -0,0 +1,64 @@
+"""dictionary-encode message role and mcp status as native enums
+
+Revision ID: c3a8f17d56e9
+Revises: b7e2f94c1a06
+Create Date: 2025-03-14 14:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8f17d56e9'
+down_revision: Union[str, None] = 'b7e2f94c1a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_msg_role = postgresql.ENUM(
+    'user', 'assistant', 'system', 'tool', name='msg_role', create_type=False
+)
+_mcp_status = postgresql.ENUM(
+    'active', 'inactive', 'maintenance', 'error', name='mcp_status',
+    create_type=False
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    _msg_role.create(bind)
+    _mcp_status.create(bind)
+    # Enum values are 4 bytes per row vs variable-length text, and
+    # comparisons are integer comparisons
+    op.alter_column(
+        'messages',
+        'role',
+        type_=_msg_role,
+        postgresql_using='role::msg_role',
+    )
+    op.alter_column(
+        'mcps',
+        'status',
+        type_=_mcp_status,
+        postgresql_using='status::mcp_status',
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'mcps',
+        'status',
+        type_=sa.String(),
+        postgresql_using='status::text',
+    )
+    op.alter_column(
+        'messages',
+        'role',
+        type_=sa.String(),
+        postgresql_using='role::text',
+    )
+    bind = op.get_bind()
+    _mcp_status.drop(bind)
+    _msg_role.drop(bind)
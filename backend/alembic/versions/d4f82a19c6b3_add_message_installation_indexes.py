@@ -0,0 +1,41 @@
+"""add message created_at and unique installation indexes
+
+Revision ID: d4f82a19c6b3
+Revises: b91f6e03ca72
+Create Date: 2025-03-13 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f82a19c6b3'
+down_revision: Union[str, None] = 'b91f6e03ca72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Default message pagination filters by conversation and orders by
+    # created_at; the existing (conversation_id, id DESC) index only
+    # approximates that via id monotonicity
+    op.create_index(
+        'ix_messages_conv_created',
+        'messages',
+        ['conversation_id', 'created_at'],
+    )
+    # One installation per (user, mcp); also serves the exact-match
+    # lookup used on install/uninstall
+    op.create_index(
+        'uq_mcp_install_user_mcp',
+        'mcp_installations',
+        ['user_id', 'mcp_id'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_mcp_install_user_mcp', table_name='mcp_installations')
+    op.drop_index('ix_messages_conv_created', table_name='messages')
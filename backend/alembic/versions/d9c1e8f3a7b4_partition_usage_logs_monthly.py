@@ -0,0 +1,190 @@
+"""partition mcp_usage_logs by month
+
+Revision ID: d9c1e8f3a7b4
+Revises: c3a8f17d56e9
+Create Date: 2025-03-15 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9c1e8f3a7b4'
+down_revision: Union[str, None] = 'c3a8f17d56e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres cannot convert a table to a partitioned one in place:
+    # rebuild mcp_usage_logs as RANGE (timestamp) partitioned, move the
+    # rows into a DEFAULT partition, and recreate everything that hung
+    # off the old table (indexes, stats trigger, daily view). Monthly
+    # partitions are created ahead of time by the app (see
+    # ensure_usage_log_partitions); retention becomes DROP TABLE on a
+    # partition instead of a bulk DELETE.
+    op.execute("ALTER TABLE mcp_usage_logs RENAME TO mcp_usage_logs_old")
+    # The view holds a dependency on the old table by OID
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mcp_usage_daily_stats")
+
+    op.execute("""
+        CREATE TABLE mcp_usage_logs (
+            id bigint GENERATED BY DEFAULT AS IDENTITY,
+            mcp_id integer NOT NULL REFERENCES mcps (id),
+            user_id integer NOT NULL REFERENCES users (id),
+            model_id varchar NOT NULL,
+            request_type varchar NOT NULL,
+            tokens_used integer,
+            latency double precision,
+            error boolean,
+            error_message varchar,
+            "timestamp" timestamptz NOT NULL DEFAULT now(),
+            bucket_day date GENERATED ALWAYS AS
+                (("timestamp" AT TIME ZONE 'UTC')::date) STORED,
+            PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.execute(
+        "CREATE TABLE mcp_usage_logs_default"
+        " PARTITION OF mcp_usage_logs DEFAULT"
+    )
+
+    op.execute("""
+        INSERT INTO mcp_usage_logs
+            (id, mcp_id, user_id, model_id, request_type, tokens_used,
+             latency, error, error_message, "timestamp")
+        SELECT id, mcp_id, user_id, model_id, request_type, tokens_used,
+               latency, error, error_message, "timestamp"
+        FROM mcp_usage_logs_old
+    """)
+    op.execute("""
+        SELECT setval(
+            pg_get_serial_sequence('mcp_usage_logs', 'id'),
+            (SELECT COALESCE(MAX(id), 1) FROM mcp_usage_logs)
+        )
+    """)
+    op.execute("DROP TABLE mcp_usage_logs_old")
+
+    # Indexes from earlier revisions, now on the partitioned parent
+    op.create_index(
+        'ix_mcp_usage_logs_mcp_ts',
+        'mcp_usage_logs',
+        ['mcp_id', sa.text('timestamp DESC')],
+        postgresql_include=['tokens_used', 'error'],
+    )
+    op.create_index(
+        'ix_mcp_usage_logs_errors',
+        'mcp_usage_logs',
+        ['mcp_id'],
+        postgresql_where=sa.text('error = true'),
+    )
+    op.create_index(
+        'ix_mcp_usage_logs_user_ts',
+        'mcp_usage_logs',
+        ['user_id', sa.text('timestamp DESC')],
+    )
+    op.create_index(
+        'ix_mcpusage_mcp_bucket_day',
+        'mcp_usage_logs',
+        ['mcp_id', 'bucket_day'],
+    )
+
+    # Aggregate-counter trigger from f6c9d24e80b5 (AFTER row triggers
+    # propagate to partitions)
+    op.execute("""
+        CREATE TRIGGER trg_mcp_usage_stats_bump
+        AFTER INSERT ON mcp_usage_logs
+        FOR EACH ROW EXECUTE FUNCTION mcp_usage_stats_bump()
+    """)
+
+    # Daily stats view, now rolling up on the stored bucket_day
+    op.execute("""
+        CREATE MATERIALIZED VIEW mcp_usage_daily_stats AS
+        SELECT mcp_id,
+               bucket_day AS day,
+               count(*) AS req,
+               count(*) FILTER (WHERE error) AS err,
+               sum(tokens_used) AS tokens,
+               count(tokens_used) AS tokens_n
+        FROM mcp_usage_logs
+        GROUP BY 1, 2
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX ix_mcp_usage_daily_stats_mcp_day
+        ON mcp_usage_daily_stats (mcp_id, day)
+    """)
+
+
+def downgrade() -> None:
+    # Rebuild as a plain table; partition boundaries are lost
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mcp_usage_daily_stats")
+    op.execute("ALTER TABLE mcp_usage_logs RENAME TO mcp_usage_logs_part")
+    op.execute("""
+        CREATE TABLE mcp_usage_logs (
+            id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            mcp_id integer NOT NULL REFERENCES mcps (id),
+            user_id integer NOT NULL REFERENCES users (id),
+            model_id varchar NOT NULL,
+            request_type varchar NOT NULL,
+            tokens_used integer,
+            latency double precision,
+            error boolean,
+            error_message varchar,
+            "timestamp" timestamptz DEFAULT now(),
+            bucket_day date GENERATED ALWAYS AS
+                (("timestamp" AT TIME ZONE 'UTC')::date) STORED
+        )
+    """)
+    op.execute("""
+        INSERT INTO mcp_usage_logs
+            (id, mcp_id, user_id, model_id, request_type, tokens_used,
+             latency, error, error_message, "timestamp")
+        SELECT id, mcp_id, user_id, model_id, request_type, tokens_used,
+               latency, error, error_message, "timestamp"
+        FROM mcp_usage_logs_part
+    """)
+    op.execute("DROP TABLE mcp_usage_logs_part")
+    op.create_index(
+        'ix_mcp_usage_logs_mcp_ts',
+        'mcp_usage_logs',
+        ['mcp_id', sa.text('timestamp DESC')],
+        postgresql_include=['tokens_used', 'error'],
+    )
+    op.create_index(
+        'ix_mcp_usage_logs_errors',
+        'mcp_usage_logs',
+        ['mcp_id'],
+        postgresql_where=sa.text('error = true'),
+    )
+    op.create_index(
+        'ix_mcp_usage_logs_user_ts',
+        'mcp_usage_logs',
+        ['user_id', sa.text('timestamp DESC')],
+    )
+    op.create_index(
+        'ix_mcpusage_mcp_bucket_day',
+        'mcp_usage_logs',
+        ['mcp_id', 'bucket_day'],
+    )
+    op.execute("""
+        CREATE TRIGGER trg_mcp_usage_stats_bump
+        AFTER INSERT ON mcp_usage_logs
+        FOR EACH ROW EXECUTE FUNCTION mcp_usage_stats_bump()
+    """)
+    op.execute("""
+        CREATE MATERIALIZED VIEW mcp_usage_daily_stats AS
+        SELECT mcp_id,
+               bucket_day AS day,
+               count(*) AS req,
+               count(*) FILTER (WHERE error) AS err,
+               sum(tokens_used) AS tokens,
+               count(tokens_used) AS tokens_n
+        FROM mcp_usage_logs
+        GROUP BY 1, 2
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX ix_mcp_usage_daily_stats_mcp_day
+        ON mcp_usage_daily_stats (mcp_id, day)
+    """)
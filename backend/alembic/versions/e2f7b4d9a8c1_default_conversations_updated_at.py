@@ -0,0 +1,43 @@
+"""backfill and default conversations.updated_at
+
+Revision ID: e2f7b4d9a8c1
+Revises: d9c1e8f3a7b4
+Create Date: 2025-03-15 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f7b4d9a8c1'
+down_revision: Union[str, None] = 'd9c1e8f3a7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # updated_at only had an onupdate, so never-updated conversations
+    # were NULL — invisible to the updated_at keyset cursor. Backfill
+    # from created_at and default new rows server-side so every row
+    # carries a cursor value.
+    op.execute(
+        "UPDATE conversations SET updated_at = created_at "
+        "WHERE updated_at IS NULL"
+    )
+    op.alter_column(
+        'conversations',
+        'updated_at',
+        server_default=sa.text('now()'),
+        nullable=False,
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'conversations',
+        'updated_at',
+        server_default=None,
+        nullable=True,
+    )
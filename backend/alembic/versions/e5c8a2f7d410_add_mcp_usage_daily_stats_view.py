@@ -0,0 +1,43 @@
+"""pre-aggregate mcp usage stats in a daily materialized view
+
+Revision ID: e5c8a2f7d410
+Revises: c2e94b7d81a5
+Create Date: 2025-03-12 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c8a2f7d410'
+down_revision: Union[str, None] = 'c2e94b7d81a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stats endpoints aggregate mcp_usage_logs on every call; the view
+    # collapses that scan to at most one row per MCP per day. tokens_n
+    # keeps the NULL-aware denominator so the average stays exact.
+    op.execute("""
+        CREATE MATERIALIZED VIEW mcp_usage_daily_stats AS
+        SELECT mcp_id,
+               date_trunc('day', timestamp) AS day,
+               count(*) AS req,
+               count(*) FILTER (WHERE error) AS err,
+               sum(tokens_used) AS tokens,
+               count(tokens_used) AS tokens_n
+        FROM mcp_usage_logs
+        GROUP BY 1, 2
+    """)
+    # Unique index required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("""
+        CREATE UNIQUE INDEX ix_mcp_usage_daily_stats_mcp_day
+        ON mcp_usage_daily_stats (mcp_id, day)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mcp_usage_daily_stats")
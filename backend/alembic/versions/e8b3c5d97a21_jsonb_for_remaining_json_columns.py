@@ -0,0 +1,47 @@
+"""convert remaining json columns to jsonb
+
+Revision ID: e8b3c5d97a21
+Revises: d4f82a19c6b3
+Create Date: 2025-03-13 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3c5d97a21'
+down_revision: Union[str, None] = 'd4f82a19c6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs still stored as text json; the mcps columns were
+# already converted by a8d51c7e93f4
+_COLUMNS = (
+    ('messages', 'meta_data'),
+    ('conversations', 'meta_data'),
+    ('users', 'preferences'),
+    ('mcp_installations', 'settings'),
+)
+
+
+def upgrade() -> None:
+    for table, column in _COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.JSONB(),
+            postgresql_using=f'{column}::jsonb',
+        )
+
+
+def downgrade() -> None:
+    for table, column in _COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.JSON(),
+            postgresql_using=f'{column}::json',
+        )
@@ -0,0 +1,31 @@
+"""add composite index for message pagination
+
+Revision ID: f3a1c9e42b17
+Revises: add_meta_data_col
+Create Date: 2025-03-10 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a1c9e42b17'
+down_revision: Union[str, None] = 'add_meta_data_col'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite index backing the message pagination queries, which filter
+    # by conversation_id and walk messages newest-first
+    op.create_index(
+        'ix_messages_conversation_id_id',
+        'messages',
+        ['conversation_id', sa.text('id DESC')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_id_id', table_name='messages')
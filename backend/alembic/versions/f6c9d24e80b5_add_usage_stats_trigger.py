@@ -0,0 +1,49 @@
+"""maintain mcp aggregate counters with an insert trigger
+
+Revision ID: f6c9d24e80b5
+Revises: e8b3c5d97a21
+Create Date: 2025-03-13 15:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c9d24e80b5'
+down_revision: Union[str, None] = 'e8b3c5d97a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Counter maintenance lives in the database so every insert path —
+    # including the batched multi-row INSERT from the log buffer — keeps
+    # total_requests and the running average_latency correct without an
+    # extra application-side UPDATE
+    op.execute("""
+        CREATE OR REPLACE FUNCTION mcp_usage_stats_bump() RETURNS trigger AS $$
+        BEGIN
+            UPDATE mcps
+            SET total_requests = total_requests + 1,
+                average_latency = CASE
+                    WHEN NEW.latency IS NULL THEN average_latency
+                    ELSE (average_latency * total_requests + NEW.latency)
+                         / (total_requests + 1)
+                END
+            WHERE id = NEW.mcp_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_mcp_usage_stats_bump
+        AFTER INSERT ON mcp_usage_logs
+        FOR EACH ROW EXECUTE FUNCTION mcp_usage_stats_bump()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_mcp_usage_stats_bump ON mcp_usage_logs")
+    op.execute("DROP FUNCTION IF EXISTS mcp_usage_stats_bump()")
@@ -0,0 +1,14 @@
+from fastapi import Response
+
+
+def rust_json(model_cls, obj) -> Response:
+    """Serialize a validated model straight through pydantic-core.
+
+    Bypasses FastAPI's jsonable_encoder walk and the response-class
+    encode: the model's compiled serializer emits the JSON bytes in one
+    pass and they go on the wire as-is.
+    """
+    return Response(
+        content=model_cls.__pydantic_serializer__.to_json(obj),
+        media_type="application/json",
+    )
@@ -1,108 +1,194 @@
-from typing import List, Optional, Dict
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from typing import List, Optional, Dict, Tuple
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from threading import RLock
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sse_starlette.sse import EventSourceResponse
 
 from app import crud
 from app.api import deps
+from app.api.fastjson import rust_json
+from app.schemas import ConversationListAdapter, MessageListAdapter
 from app.schemas.conversation import (
     Conversation,
     ConversationCreate,
     ConversationUpdate,
-    ConversationPagination,
     Message,
     MessageCreate,
     MessagePagination,
-    StreamResponse,
     ModelInfo
 )
 from app.models.user import User
+from app.db.session import AsyncSessionLocal
 from app.core.config import settings
+from app.core.logging import logger
 from app.core.llm.chain import ConversationChain
 from app.core.llm.streaming import StreamingCallbackHandler
 from app.core.llm.providers import MODEL_CONFIGS
 
 # 导入模块级函数以便直接使用
 from app.crud.conversation import (
-    get_conversation, 
-    get_conversations,
-    create_conversation, 
-    update_conversation, 
-    delete_conversation,
-    get_messages,
-    create_message
+    get_conversation_async,
+    get_conversations_async,
+    create_conversation_async,
+    update_conversation_async,
+    update_conversation_fields_async,
+    delete_conversation_async,
+    get_messages_async,
+    get_conversation_cached_async,
+    create_messages_and_bump_async,
+    update_message_content_async
 )
 
-# Store active conversation chains
-active_chains: Dict[int, ConversationChain] = {}
+class ChainCache(OrderedDict):
+    """LRU cache for active conversation chains.
+
+    Bounded so long-running workers don't keep a chain alive for every
+    conversation ever touched. Evicted chains get their memory cleared so
+    the underlying LLM memory is released deterministically.
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            _, evicted = self.popitem(last=False)
+            evicted.clear_memory()
+
+    def get(self, key, default=None):
+        # dict.get bypasses __getitem__, so route it through our LRU lookup
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+# Store active conversation chains, keyed by (user_id, conversation_id)
+# so chains are never shared across users
+active_chains: ChainCache = ChainCache(maxsize=settings.MAX_ACTIVE_CHAINS)
+active_chains_lock = RLock()
 
 router = APIRouter()
 # 创建一个单独的router用于模型API
 models_router = APIRouter()
 
+# MODEL_CONFIGS is static for the process lifetime, so derive the model
+# list and the new-conversation payload once at import instead of
+# rebuilding them on every request
+AVAILABLE_MODEL_INFOS: List[ModelInfo] = [
+    ModelInfo(
+        id=model_id,
+        name=config.get("name", model_id),
+        description=config.get("description", ""),
+        provider=config.get("provider", "Unknown")
+    )
+    for model_id, config in MODEL_CONFIGS.items()
+]
+DEFAULT_MODEL_ID: str = next(iter(MODEL_CONFIGS.keys()), "")
+NEW_CONVERSATION_CONFIG: Dict = {
+    "default_model": DEFAULT_MODEL_ID,
+    "available_models": [
+        {
+            "id": model.id,
+            "name": model.name,
+            "description": model.description or "",
+            "provider": model.provider
+        }
+        for model in AVAILABLE_MODEL_INFOS
+    ]
+}
+
+@lru_cache(maxsize=None)
+def get_system_prompt(model_name: str) -> str:
+    """Build the model-specific system prompt, cached per model name"""
+    model_config = MODEL_CONFIGS.get(model_name, {})
+    model_display_name = model_config.get("name", "AI")
+    provider_name = model_config.get("provider", "")
+
+    if provider_name and model_display_name:
+        return f"You are {model_display_name}, a helpful AI assistant by {provider_name}. Provide clear and concise responses."
+    return "You are a helpful AI assistant. Provide clear and concise responses."
+
+
 def get_conversation_chain(conversation_id: int, model_name: str, user_id: int = None) -> ConversationChain:
     """Get or create a conversation chain for the given conversation ID"""
-    # If the chain exists but uses a different model, delete it and recreate
-    if conversation_id in active_chains and active_chains[conversation_id].model_name != model_name:
-        del active_chains[conversation_id]
-        
-    # Create a new chain if needed
-    if conversation_id not in active_chains:
-        # Get the model config to determine its name
-        model_config = MODEL_CONFIGS.get(model_name, {})
-        model_display_name = model_config.get("name", "AI")
-        provider_name = model_config.get("provider", "")
-        
-        # Create a model-specific system prompt
-        if provider_name and model_display_name:
-            system_prompt = f"You are {model_display_name}, a helpful AI assistant by {provider_name}. Provide clear and concise responses."
-        else:
-            system_prompt = f"You are a helpful AI assistant. Provide clear and concise responses."
-            
-        active_chains[conversation_id] = ConversationChain(
+    key = (user_id, conversation_id)
+    with active_chains_lock:
+        # Single lookup: reuse the cached chain unless the model changed
+        chain = active_chains.get(key)
+        if chain is not None and chain.model_name == model_name:
+            return chain
+
+        chain = ConversationChain(
             model_name=model_name,
             memory_size=10,
-            system_prompt=system_prompt,
+            system_prompt=get_system_prompt(model_name),
             user_id=user_id
         )
-    return active_chains[conversation_id]
+        active_chains[key] = chain
+        return chain
 
 
-@router.get("/", response_model=ConversationPagination)
-def list_conversations(
-    db: Session = Depends(deps.get_db),
+@router.get("/")
+async def list_conversations(
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_active_user),
     page: int = 1,
     size: int = 10,
+    updated_before: Optional[datetime] = None,
 ):
     """
     Retrieve conversations for the current user.
+
+    Pass updated_before (the updated_at of the last conversation already
+    seen) to paginate by keyset instead of page offset.
     """
     skip = (page - 1) * size
-    items, total = get_conversations(
-        db=db, user_id=current_user.id, skip=skip, limit=size
+    items, total = await get_conversations_async(
+        db=db, user_id=current_user.id, skip=skip, limit=size,
+        updated_before=updated_before
     )
-    
+
+    # Validate and dump through the warm list adapter instead of letting
+    # a response_model rebuild per-call validation machinery
     return {
+        # None on keyset pages — the cursor replaces the page count
         "total": total,
-        "items": items,
+        "items": ConversationListAdapter.dump_python(
+            ConversationListAdapter.validate_python(items, from_attributes=True),
+            mode="json",
+        ),
         "page": page,
-        "size": size
+        "size": size,
+        # updated_at is NOT NULL (defaulted at insert), so a full page
+        # always yields a cursor
+        "next_cursor": items[-1].updated_at.isoformat() if items else None,
     }
 
 
 @router.post("/", response_model=Conversation)
-def create_conversations(
+async def create_conversations(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     conversation_in: ConversationCreate,
     current_user: User = Depends(deps.get_current_active_user),
 ):
     """
     Create new conversation.
     """
-    conversation = create_conversation(
+    conversation = await create_conversation_async(
         db=db, conversation=conversation_in, user_id=current_user.id
     )
     return conversation
@@ -115,21 +201,7 @@ def new_conversation(
     """
     Get configuration for new conversation.
     """
-    # 获取默认模型
-    default_model = next(iter(MODEL_CONFIGS.keys()), "")
-    
-    return {
-        "default_model": default_model,
-        "available_models": [
-            {
-                "id": model_id,
-                "name": config.get("name", model_id),
-                "description": config.get("description", ""),
-                "provider": config.get("provider", "Unknown")
-            }
-            for model_id, config in MODEL_CONFIGS.items()
-        ]
-    }
+    return NEW_CONVERSATION_CONFIG
 
 
 @router.get("/new/messages", response_model=MessagePagination)
@@ -149,27 +221,29 @@ def handle_new_messages(
     }
 
 
-@router.get("/{conversation_id}", response_model=Conversation)
-def get_conversation_by_id(
+@router.get("/{conversation_id}")
+async def get_conversation_by_id(
     conversation_id: int,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_active_user),
 ):
     """
     Get conversation by ID.
     """
-    conversation = get_conversation(
+    conversation = await get_conversation_async(
         db=db, conversation_id=conversation_id, user_id=current_user.id
     )
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    return conversation
+    # One validate, then straight to JSON bytes via the compiled
+    # pydantic-core serializer — no jsonable_encoder walk
+    return rust_json(Conversation, Conversation.model_validate(conversation))
 
 
-@router.put("/{conversation_id}", response_model=Conversation)
-def update_conversation_by_id(
+@router.put("/{conversation_id}")
+async def update_conversation_by_id(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     conversation_id: int,
     conversation_in: ConversationUpdate,
     current_user: User = Depends(deps.get_current_active_user),
@@ -177,75 +251,84 @@ def update_conversation_by_id(
     """
     Update conversation.
     """
-    conversation = get_conversation(
-        db=db, conversation_id=conversation_id, user_id=current_user.id
+    conversation = await update_conversation_fields_async(
+        db=db, conversation_id=conversation_id, user_id=current_user.id,
+        update_data=conversation_in
     )
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    
-    # Check if the model is being updated
-    if conversation_in.model and conversation_in.model != conversation.model:
-        # If the model changed, remove the existing conversation chain
-        if conversation_id in active_chains:
-            del active_chains[conversation_id]
-    
-    conversation = update_conversation(
-        db=db, conversation=conversation, update_data=conversation_in
-    )
-    return conversation
+
+    # If the model may have changed, drop the cached chain so the next
+    # message recreates it against the new model
+    if conversation_in.model:
+        with active_chains_lock:
+            active_chains.pop((current_user.id, conversation_id), None)
+
+    # Validate once, serialize with the compiled pydantic-core
+    # serializer instead of the jsonable_encoder walk
+    return rust_json(Conversation, Conversation.model_validate(conversation))
 
 
 @router.delete("/{conversation_id}")
-def delete_conversation_by_id(
+async def delete_conversation_by_id(
     conversation_id: int,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_active_user),
 ):
     """
     Delete conversation.
     """
-    conversation = get_conversation(
+    conversation = await get_conversation_async(
         db=db, conversation_id=conversation_id, user_id=current_user.id
     )
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    delete_conversation(db=db, conversation=conversation)
+    await delete_conversation_async(db=db, conversation=conversation)
     return {"status": "success"}
 
 
-@router.get("/{conversation_id}/messages", response_model=MessagePagination)
-def list_messages(
+@router.get("/{conversation_id}/messages")
+async def list_messages(
     conversation_id: int,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_active_user),
     page: int = 1,
     size: int = 50,
+    after_id: Optional[int] = None,
 ):
     """
     Retrieve messages for a conversation.
+
+    Pass after_id (the id of the last message already seen) to paginate
+    by keyset instead of page offset.
     """
-    conversation = get_conversation(
+    conversation = await get_conversation_cached_async(
         db=db, conversation_id=conversation_id, user_id=current_user.id
     )
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
-        
+
     skip = (page - 1) * size
-    items, total = get_messages(
-        db=db, conversation_id=conversation_id, skip=skip, limit=size
+    items, total = await get_messages_async(
+        db=db, conversation_id=conversation_id, skip=skip, limit=size,
+        after_id=after_id
     )
     return {
         "total": total,
-        "items": items,
+        "items": MessageListAdapter.dump_python(
+            MessageListAdapter.validate_python(items, from_attributes=True),
+            mode="json",
+        ),
         "page": page,
-        "size": size
+        "size": size,
+        "next_cursor": str(items[-1].id) if items else None,
     }
 
 
 @router.post("/{conversation_id}/messages", response_model=Message)
 async def create_user_message(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     conversation_id: int,
     message_in: MessageCreate,
     current_user: User = Depends(deps.get_current_active_user),
@@ -253,37 +336,23 @@ async def create_user_message(
     """
     Create new message and get AI response.
     """
-    conversation = get_conversation(
+    conversation = await get_conversation_cached_async(
         db=db, conversation_id=conversation_id, user_id=current_user.id
     )
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
-        
-    # Create user message
-    user_message = create_message(
-        db=db, 
-        message=message_in, 
-        conversation_id=conversation_id
-    )
-    
+
     # Get AI response using the conversation chain
     chain = get_conversation_chain(conversation_id, conversation.model, current_user.id)
     ai_response = await chain.generate_response(message_in.content)
-    
-    # Create assistant message
-    assistant_message = create_message(
+
+    # Persist both messages and bump the conversation in one transaction
+    user_message, assistant_message = await create_messages_and_bump_async(
         db=db,
-        message=MessageCreate(content=ai_response),
-        conversation_id=conversation_id
+        conversation_id=conversation_id,
+        messages=[message_in, MessageCreate(content=ai_response)]
     )
-    
-    # Update conversation's updated_at timestamp
-    update_conversation(
-        db=db, 
-        conversation=conversation,
-        update_data=ConversationUpdate(updated_at=assistant_message.created_at)
-    )
-    
+
     return assistant_message
 
 
@@ -292,77 +361,60 @@ async def stream_response(
     request: Request,
     conversation_id: int,
     message_in: MessageCreate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_active_user),
 ):
     """
     Stream AI response for a new message.
     """
-    conversation = get_conversation(
+    conversation = await get_conversation_cached_async(
         db=db, conversation_id=conversation_id, user_id=current_user.id
     )
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
-        
-    # Create user message
-    user_message = create_message(
-        db=db, 
-        message=message_in, 
-        conversation_id=conversation_id
+
+    # Create the user message and the assistant placeholder together and
+    # bump the conversation in a single transaction before streaming starts
+    user_message, assistant_message = await create_messages_and_bump_async(
+        db=db,
+        conversation_id=conversation_id,
+        messages=[message_in, MessageCreate(content="")]
     )
-    
+
     # Get conversation chain
     chain = get_conversation_chain(conversation_id, conversation.model, current_user.id)
-    
-    # Create a placeholder for the assistant message
-    assistant_message = create_message(
-        db=db,
-        message=MessageCreate(content=""),
-        conversation_id=conversation_id
-    )
-    
-    # Update conversation's updated_at timestamp
-    update_conversation(
-        db=db, 
-        conversation=conversation,
-        update_data=ConversationUpdate(updated_at=assistant_message.created_at)
-    )
-    
-    # Function to handle background task after streaming completes
-    async def update_message_content(conversation_id: int, message_id: int, content: str):
-        """Update message content in database after streaming is complete"""
-        messages, _ = get_messages(db, conversation_id=conversation_id)
-        if messages:
-            for msg in messages:
-                if msg.id == message_id:
-                    msg.content = content
-                    db.commit()
-                    break
-    
+
+
     # Stream response generator
     async def stream_generator():
-        full_response = ""
+        # Collect chunks in a list and join once at the end: repeated
+        # string concatenation is quadratic over long responses
+        chunks = []
         try:
             async for chunk in chain.astream_response(message_in.content):
                 if chunk:
-                    full_response += chunk
+                    chunks.append(chunk)
                     # Send the chunk directly
                     yield chunk.encode('utf-8')
-                    
-            # Schedule task to update the message content after streaming completes
-            background_tasks = BackgroundTasks()
-            background_tasks.add_task(
-                update_message_content, 
-                conversation_id=conversation_id,
-                message_id=assistant_message.id,
-                content=full_response
-            )
-                
+
         except Exception as e:
             error_msg = f"Error generating response: {str(e)}"
             yield error_msg.encode('utf-8')
-            print(f"Error in stream_response: {error_msg}")
-    
+            logger.error("Error in stream_response: %s", error_msg, exc_info=True)
+        finally:
+            full_response = "".join(chunks)
+            # Persist whatever was streamed on a fresh session: the
+            # request-scoped session may already be closed by the time
+            # the stream finishes
+            if full_response:
+                async with AsyncSessionLocal() as session:
+                    await update_message_content_async(
+                        session,
+                        message_id=assistant_message.id,
+                        content=full_response
+                    )
+
+
     # Return streaming response
     return StreamingResponse(
         stream_generator(),
@@ -377,21 +429,13 @@ def list_models(
     """
     List available AI models.
     """
-    models = []
-    for model_id, config in MODEL_CONFIGS.items():
-        models.append(ModelInfo(
-            id=model_id,
-            name=config.get("name", model_id),
-            description=config.get("description", ""),
-            provider=config.get("provider", "Unknown")
-        ))
-    return models
-
-
-@router.put("/{conversation_id}/model", response_model=Conversation)
-def update_conversation_model(
+    return AVAILABLE_MODEL_INFOS
+
+
+@router.put("/{conversation_id}/model")
+async def update_conversation_model(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     conversation_id: int,
     model_in: Dict[str, str],
     current_user: User = Depends(deps.get_current_active_user),
@@ -399,37 +443,41 @@ def update_conversation_model(
     """
     Update conversation model and reset the conversation chain.
     """
-    conversation = get_conversation(
+    conversation = await get_conversation_async(
         db=db, conversation_id=conversation_id, user_id=current_user.id
     )
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
-        
+
     # Check if model_id is provided
     model_id = model_in.get("model_id")
     if not model_id:
         raise HTTPException(status_code=400, detail="model_id is required")
-        
+
     # Check if the model exists
     if model_id not in MODEL_CONFIGS:
         raise HTTPException(status_code=400, detail=f"Unsupported model: {model_id}")
-    
+
     # Update the conversation
-    conversation = update_conversation(
-        db=db, 
-        conversation=conversation, 
+    conversation = await update_conversation_async(
+        db=db,
+        conversation=conversation,
         update_data=ConversationUpdate(model=model_id)
     )
     
     # Reset the conversation chain
-    if conversation_id in active_chains:
-        active_chains[conversation_id].clear_memory()
-        del active_chains[conversation_id]
-        
+    with active_chains_lock:
+        chain = active_chains.pop((current_user.id, conversation_id), None)
+        if chain:
+            chain.clear_memory()
+
+
     # Create a new chain with the updated model
     get_conversation_chain(conversation_id, model_id, current_user.id)
-    
-    return conversation
+
+    # Validate once, serialize with the compiled pydantic-core
+    # serializer instead of the jsonable_encoder walk
+    return rust_json(Conversation, Conversation.model_validate(conversation))
 
 
 @models_router.get("/", response_model=List[ModelInfo])
@@ -439,21 +487,13 @@ def list_models_api(
     """
     List available AI models.
     """
-    models = []
-    for model_id, config in MODEL_CONFIGS.items():
-        models.append(ModelInfo(
-            id=model_id,
-            name=config.get("name", model_id),
-            description=config.get("description", ""),
-            provider=config.get("provider", "Unknown")
-        ))
-    return models
+    return AVAILABLE_MODEL_INFOS
 
 
 @router.post("/{conversation_id}/reset")
-def reset_conversation_chain(
+async def reset_conversation_chain(
     conversation_id: int,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: User = Depends(deps.get_current_active_user),
 ):
     """
@@ -466,32 +506,37 @@ def reset_conversation_chain(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid conversation ID format")
     
-    conversation = get_conversation(
+    conversation = await get_conversation_async(
         db=db, conversation_id=conversation_id_int, user_id=current_user.id
     )
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    # Log information for debugging    
-    print(f"Resetting conversation {conversation_id_int} with model '{conversation.model}'")
-        
+    logger.info(
+        "Resetting conversation chain",
+        extra={"conversation_id": conversation_id_int, "model": conversation.model}
+    )
+
     # Remove the existing conversation chain if it exists
-    if conversation_id_int in active_chains:
+    with active_chains_lock:
+        chain = active_chains.pop((current_user.id, conversation_id_int), None)
+    if chain:
         try:
             # First clear memory
-            active_chains[conversation_id_int].clear_memory()
-            print(f"Memory cleared for conversation {conversation_id_int}")
+            chain.clear_memory()
         except Exception as e:
-            print(f"Error clearing memory: {e}")
-            
-        # Then delete the chain
-        del active_chains[conversation_id_int]
-        print(f"Chain deleted for conversation {conversation_id_int}")
+            logger.warning(
+                "Error clearing conversation memory",
+                extra={"conversation_id": conversation_id_int, "error": str(e)}
+            )
+        logger.debug(
+            "Conversation chain deleted",
+            extra={"conversation_id": conversation_id_int}
+        )
     
     # Get the model from the conversation or use a default if it's empty
     model_name = conversation.model
     if not model_name or model_name.strip() == "":
-        print(f"Conversation {conversation_id_int} has no model, looking for default")
         # Get the first available model as default
         default_model = next(iter(MODEL_CONFIGS.keys()), None)
         if not default_model:
@@ -500,22 +545,30 @@ def reset_conversation_chain(
                 detail="No models available and conversation has no model specified"
             )
         
-        print(f"Using default model {default_model}")
+        logger.info(
+            "Conversation has no model, using default",
+            extra={"conversation_id": conversation_id_int, "model": default_model}
+        )
         # Update the conversation with the default model
-        conversation = update_conversation(
-            db=db, 
-            conversation=conversation, 
+        conversation = await update_conversation_async(
+            db=db,
+            conversation=conversation,
             update_data=ConversationUpdate(model=default_model)
         )
         model_name = default_model
     
     # Get a fresh conversation chain with the current model
     try:
-        print(f"Creating new chain for conversation {conversation_id_int} with model {model_name}")
         get_conversation_chain(conversation_id_int, model_name, current_user.id)
-        print(f"Chain created successfully")
     except ValueError as e:
-        print(f"Error creating chain: {e}")
+        logger.warning(
+            "Error creating conversation chain",
+            extra={
+                "conversation_id": conversation_id_int,
+                "model": model_name,
+                "error": str(e)
+            }
+        )
         # If the model is not supported, try to use the first available model
         default_model = next(iter(MODEL_CONFIGS.keys()), None)
         if not default_model:
@@ -524,19 +577,24 @@ def reset_conversation_chain(
                 detail=f"Error initializing conversation chain: {str(e)}"
             )
         
-        print(f"Falling back to default model {default_model}")
+        logger.info(
+            "Falling back to default model",
+            extra={"conversation_id": conversation_id_int, "model": default_model}
+        )
         # Update the conversation with the default model
-        conversation = update_conversation(
-            db=db, 
-            conversation=conversation, 
+        conversation = await update_conversation_async(
+            db=db,
+            conversation=conversation,
             update_data=ConversationUpdate(model=default_model)
         )
         # Try again with the default model
         try:
             get_conversation_chain(conversation_id_int, default_model, current_user.id)
-            print(f"Chain created with fallback model")
         except Exception as e:
-            print(f"Failed to create chain even with fallback model: {e}")
+            logger.error(
+                "Failed to create chain even with fallback model",
+                extra={"conversation_id": conversation_id_int, "error": str(e)}
+            )
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to create conversation chain: {str(e)}"
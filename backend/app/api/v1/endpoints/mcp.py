@@ -1,11 +1,15 @@
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import time
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
+from app.schemas import MCPListAdapter, MCPInstallationListAdapter
 from app.core.config import settings
 from app.schemas.mcp import (
     MCP,
@@ -14,57 +18,116 @@ from app.schemas.mcp import (
     MCPWithStats,
     MCPInstallation,
     MCPInstallationCreate,
+    MCPValidationRequest,
     MCPValidationResult,
 )
 
 router = APIRouter()
 
+# Shared client so validations reuse pooled connections instead of paying
+# a TCP/TLS handshake per call
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=10.0)
+    return _http_client
+
+
+# Recent validation results, so repeated probes of the same endpoint
+# within the TTL don't re-hit the MCP. Keys are sha256 digests so the
+# plaintext api_key never sits in process memory; failures expire fast
+# so an admin who fixes their endpoint isn't stuck behind a stale error
+_validation_cache: Dict[bytes, Tuple[float, MCPValidationResult]] = {}
+VALIDATION_CACHE_TTL = 60.0  # seconds, successful probes
+VALIDATION_CACHE_NEG_TTL = 5.0  # seconds, failed probes
+VALIDATION_CACHE_MAXSIZE = 1024
+
 
 async def validate_mcp_connection(
     api_endpoint: str,
     api_key: str,
 ) -> MCPValidationResult:
     """Validate MCP connection and detect capabilities"""
+    cache_key = hashlib.sha256(
+        api_endpoint.encode() + b"\x00" + api_key.encode()
+    ).digest()
+    cached = _validation_cache.get(cache_key)
+    if cached:
+        ttl = (
+            VALIDATION_CACHE_TTL if cached[1].is_valid
+            else VALIDATION_CACHE_NEG_TTL
+        )
+        if time.monotonic() - cached[0] < ttl:
+            return cached[1]
+
+    result = await _probe_mcp_connection(api_endpoint, api_key)
+    if len(_validation_cache) >= VALIDATION_CACHE_MAXSIZE:
+        # Oldest-insertion eviction, same as the verify-password memo
+        _validation_cache.pop(next(iter(_validation_cache)))
+    _validation_cache[cache_key] = (time.monotonic(), result)
+    return result
+
+
+async def _probe_mcp_connection(
+    api_endpoint: str,
+    api_key: str,
+) -> MCPValidationResult:
     try:
-        async with httpx.AsyncClient() as client:
-            # Test connection with health check
-            start_time = datetime.utcnow()
+        client = get_http_client()
+        headers = {"Authorization": f"Bearer {api_key}"}
+        # Health check and model discovery are independent calls to the
+        # same server, so issue them concurrently; perf_counter is
+        # monotonic and much cheaper than datetime arithmetic. Health
+        # gets a tight budget so a blackholed endpoint can't hold a
+        # pool slot for the full timeout; only /models may read longer.
+        start_time = time.perf_counter()
+        models_task = asyncio.ensure_future(
+            client.get(
+                f"{api_endpoint}/models",
+                headers=headers,
+                timeout=httpx.Timeout(10.0, connect=2.0),
+            )
+        )
+        try:
             response = await client.get(
                 f"{api_endpoint}/health",
-                headers={"Authorization": f"Bearer {api_key}"},
-                timeout=10.0
+                headers=headers,
+                timeout=httpx.Timeout(5.0, connect=2.0),
             )
-            latency = (datetime.utcnow() - start_time).total_seconds() * 1000
-            
-            if response.status_code != 200:
-                return MCPValidationResult(
-                    is_valid=False,
-                    error_message=f"Health check failed: {response.status_code}",
-                    latency=latency
-                )
-            
-            # Get models and capabilities
-            models_response = await client.get(
-                f"{api_endpoint}/models",
-                headers={"Authorization": f"Bearer {api_key}"},
-                timeout=10.0
+        except Exception:
+            models_task.cancel()
+            raise
+        latency = (time.perf_counter() - start_time) * 1000
+
+        if response.status_code != 200:
+            # Health already failed; don't wait on model discovery
+            models_task.cancel()
+            return MCPValidationResult(
+                is_valid=False,
+                error_message=f"Health check failed: {response.status_code}",
+                latency=latency
             )
-            
-            if models_response.status_code != 200:
-                return MCPValidationResult(
-                    is_valid=False,
-                    error_message="Failed to fetch models",
-                    latency=latency
-                )
-            
-            models_data = models_response.json()
+
+        models_response = await models_task
+
+        if models_response.status_code != 200:
             return MCPValidationResult(
-                is_valid=True,
-                detected_models=models_data.get("models", []),
-                detected_capabilities=models_data.get("capabilities", []),
+                is_valid=False,
+                error_message="Failed to fetch models",
                 latency=latency
             )
-            
+
+        models_data = models_response.json()
+        return MCPValidationResult(
+            is_valid=True,
+            detected_models=models_data.get("models", []),
+            detected_capabilities=models_data.get("capabilities", []),
+            latency=latency
+        )
+
     except Exception as e:
         return MCPValidationResult(
             is_valid=False,
@@ -73,7 +136,7 @@ async def validate_mcp_connection(
         )
 
 
-@router.get("/mcps", response_model=List[MCP])
+@router.get("/mcps")
 def list_mcps(
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
@@ -94,7 +157,12 @@ def list_mcps(
         capability=capability,
         model_id=model_id
     )
-    return mcps
+    # Warm list adapter: one validate + one dump, no per-call
+    # response_model machinery
+    return MCPListAdapter.dump_python(
+        MCPListAdapter.validate_python(mcps, from_attributes=True),
+        mode="json",
+    )
 
 
 @router.post("/mcps", response_model=MCP)
@@ -142,17 +210,12 @@ def get_mcp(
     """
     Get MCP by ID with usage statistics.
     """
-    mcp = crud.mcp.get(db, id=mcp_id)
-    if not mcp:
+    # Single round-trip for the MCP row plus its aggregated stats
+    mcp_with_stats = crud.mcp.get_with_stats(db, id=mcp_id)
+    if not mcp_with_stats:
         raise HTTPException(status_code=404, detail="MCP not found")
-    
-    # Get statistics
-    stats = crud.mcp.get_mcp_stats(db, mcp_id=mcp_id)
-    
-    return {
-        **mcp.__dict__,
-        **stats
-    }
+
+    return mcp_with_stats
 
 
 @router.put("/mcps/{mcp_id}", response_model=MCP)
@@ -214,7 +277,7 @@ def delete_mcp(
     return {"status": "success"}
 
 
-@router.get("/users/me/mcps", response_model=List[MCPInstallation])
+@router.get("/users/me/mcps")
 def list_user_mcps(
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
@@ -230,7 +293,12 @@ def list_user_mcps(
         skip=skip,
         limit=limit
     )
-    return installations
+    return MCPInstallationListAdapter.dump_python(
+        MCPInstallationListAdapter.validate_python(
+            installations, from_attributes=True
+        ),
+        mode="json",
+    )
 
 
 @router.post("/users/me/mcps", response_model=MCPInstallation)
@@ -306,4 +374,24 @@ async def validate_mcp(
     Validate MCP connection and detect capabilities.
     Only superusers can validate MCPs.
     """
-    return await validate_mcp_connection(api_endpoint, api_key) 
\ No newline at end of file
+    return await validate_mcp_connection(api_endpoint, api_key)
+
+
+@router.post("/mcps/validate-batch", response_model=List[MCPValidationResult])
+async def validate_mcps_batch(
+    *,
+    validations_in: List[MCPValidationRequest],
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Validate several MCP connections concurrently.
+    Only superusers can validate MCPs.
+    """
+    # Cap the fan-out so a large batch can't exhaust the connection pool
+    semaphore = asyncio.Semaphore(16)
+
+    async def validate_one(item: MCPValidationRequest) -> MCPValidationResult:
+        async with semaphore:
+            return await validate_mcp_connection(item.api_endpoint, item.api_key)
+
+    return await asyncio.gather(*(validate_one(item) for item in validations_in)) 
\ No newline at end of file
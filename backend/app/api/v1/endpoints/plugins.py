@@ -3,11 +3,15 @@ from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File,
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 import os
+import re
 import shutil
 import uuid
 import json
+
+import orjson
 from datetime import datetime
 
+from app.core.logging import logger
 from app.db.session import get_db
 from app.core.config import settings
 from app.api.deps import get_current_active_user
@@ -15,6 +19,21 @@ from app.schemas.user import User
 
 router = APIRouter()
 
+# 插件相关路径在导入时解析一次，请求路径上不再重复os.path.join
+PLUGINS_STORE_DIR = os.path.join(settings.PLUGINS_DIR, "store")
+PLUGINS_INSTALLED_DIR = os.path.join(settings.PLUGINS_DIR, "installed")
+PLUGINS_STORE_JSON = os.path.join(settings.PLUGINS_DIR, "store.json")
+PLUGINS_INSTALLED_JSON = os.path.join(settings.PLUGINS_DIR, "installed.json")
+
+
+def _find_by_prefix(dirpath: str, prefix: str) -> List[str]:
+    # 模式始终是字面前缀，startswith比glob的fnmatch扫描快得多
+    try:
+        with os.scandir(dirpath) as it:
+            return [entry.path for entry in it if entry.name.startswith(prefix)]
+    except OSError:
+        return []
+
 # 插件模型
 class PluginBase(BaseModel):
     name: str
@@ -49,29 +68,77 @@ class PluginSearchParams(BaseModel):
 
 # 初始化插件目录
 def init_plugin_dirs():
-    os.makedirs(os.path.join(settings.PLUGINS_DIR, "store"), exist_ok=True)
-    os.makedirs(os.path.join(settings.PLUGINS_DIR, "installed"), exist_ok=True)
+    os.makedirs(PLUGINS_STORE_DIR, exist_ok=True)
+    os.makedirs(PLUGINS_INSTALLED_DIR, exist_ok=True)
     
     # 如果没有 plugins.json，创建一个空的
-    store_file = os.path.join(settings.PLUGINS_DIR, "store.json")
-    if not os.path.exists(store_file):
-        with open(store_file, "w") as f:
+    if not os.path.exists(PLUGINS_STORE_JSON):
+        with open(PLUGINS_STORE_JSON, "w") as f:
             json.dump([], f)
     
-    installed_file = os.path.join(settings.PLUGINS_DIR, "installed.json")
-    if not os.path.exists(installed_file):
-        with open(installed_file, "w") as f:
+    if not os.path.exists(PLUGINS_INSTALLED_JSON):
+        with open(PLUGINS_INSTALLED_JSON, "w") as f:
             json.dump([], f)
 
 
-# 获取所有插件
-def get_all_plugins():
-    store_file = os.path.join(settings.PLUGINS_DIR, "store.json")
+# JSON文件缓存，按mtime失效，避免每个请求都重新读取和解析插件列表
+_plugin_file_cache: Dict[str, Any] = {}
+
+
+def _load_plugins_file(path: str) -> List[Dict[str, Any]]:
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return []
+    cached = _plugin_file_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        # Shallow copy so callers can append/filter without corrupting
+        # the cached list
+        return list(cached[1])
     try:
-        with open(store_file, "r") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
     except:
         return []
+    _plugin_file_cache[path] = (mtime, data)
+    return list(data)
+
+
+# 获取所有插件
+def get_all_plugins():
+    return _load_plugins_file(PLUGINS_STORE_JSON)
+
+
+# 仓库搜索用的倒排索引（token -> 插件下标），随store.json的mtime一起失效
+_store_index: tuple = (None, {}, {})
+
+
+def _get_store_indexes():
+    global _store_index
+    plugins = _load_plugins_file(PLUGINS_STORE_JSON)
+    try:
+        mtime = os.path.getmtime(PLUGINS_STORE_JSON)
+    except OSError:
+        mtime = None
+    if _store_index[0] != mtime:
+        tag_index: Dict[str, set] = {}
+        repo_index: Dict[str, set] = {}
+        for i, plugin in enumerate(plugins):
+            text = " ".join(
+                [
+                    plugin.get("name", ""),
+                    plugin.get("description", ""),
+                    plugin.get("author", ""),
+                ]
+                + list(plugin.get("tags", []))
+            )
+            for token in set(re.findall(r"\w+", text.lower())):
+                tag_index.setdefault(token, set()).add(i)
+            repository = plugin.get("repository")
+            if repository:
+                repo_index.setdefault(repository, set()).add(i)
+        _store_index = (mtime, tag_index, repo_index)
+    return plugins, _store_index[1], _store_index[2]
 
 
 # 获取已安装插件
@@ -98,26 +165,21 @@ def get_installed_plugins():
         "data": "插件生成的响应文本"
     }
     """
-    installed_file = os.path.join(settings.PLUGINS_DIR, "installed.json")
-    try:
-        with open(installed_file, "r") as f:
-            return json.load(f)
-    except:
-        return []
+    return _load_plugins_file(PLUGINS_INSTALLED_JSON)
 
 
 # 保存插件列表
 def save_plugins(plugins):
-    store_file = os.path.join(settings.PLUGINS_DIR, "store.json")
-    with open(store_file, "w") as f:
-        json.dump(plugins, f, indent=2)
+    with open(PLUGINS_STORE_JSON, "wb") as f:
+        f.write(orjson.dumps(plugins, option=orjson.OPT_INDENT_2))
+    _plugin_file_cache.pop(PLUGINS_STORE_JSON, None)
 
 
 # 保存已安装插件列表
 def save_installed_plugins(plugins):
-    installed_file = os.path.join(settings.PLUGINS_DIR, "installed.json")
-    with open(installed_file, "w") as f:
-        json.dump(plugins, f, indent=2)
+    with open(PLUGINS_INSTALLED_JSON, "wb") as f:
+        f.write(orjson.dumps(plugins, option=orjson.OPT_INDENT_2))
+    _plugin_file_cache.pop(PLUGINS_INSTALLED_JSON, None)
 
 
 @router.get("/", response_model=Dict[str, Any])
@@ -133,25 +195,24 @@ def list_plugins(
     init_plugin_dirs()
     
     plugins = get_all_plugins()
-    installed_ids = [p["id"] for p in get_installed_plugins()]
-    
-    # 标记已安装的插件
+    installed_ids = {p["id"] for p in get_installed_plugins()}
+
+    # 单次遍历：标记安装状态并应用搜索过滤
+    query = query.lower() if query else None
+    filtered = []
     for plugin in plugins:
         plugin["isInstalled"] = plugin["id"] in installed_ids
-    
-    # 搜索
-    if query:
-        query = query.lower()
-        plugins = [
-            p for p in plugins
-            if (
-                query in p["name"].lower() or
-                query in p["description"].lower() or
-                query in p["author"].lower() or
-                any(query in tag.lower() for tag in p["tags"])
-            )
-        ]
-    
+        if query and not (
+            query in plugin["name"].lower() or
+            query in plugin["description"].lower() or
+            query in plugin["author"].lower() or
+            any(query in tag.lower() for tag in plugin["tags"])
+        ):
+            continue
+        filtered.append(plugin)
+    plugins = filtered
+
+
     # 排序
     if sort == "popular":
         plugins.sort(key=lambda p: p["downloads"], reverse=True)
@@ -200,7 +261,7 @@ def get_plugin(
         raise HTTPException(status_code=404, detail="Plugin not found")
     
     # 标记安装状态
-    installed_ids = [p["id"] for p in get_installed_plugins()]
+    installed_ids = {p["id"] for p in get_installed_plugins()}
     plugin["isInstalled"] = plugin["id"] in installed_ids
     
     return plugin
@@ -255,11 +316,11 @@ async def upload_plugin(
     if repository:
         new_plugin["repository"] = repository
     
-    # 保存插件文件
-    file_path = os.path.join(settings.PLUGINS_DIR, "store", f"{plugin_id}_{file.filename}")
+    # 保存插件文件（分块写入，避免把整个上传内容读入内存）
+    file_path = os.path.join(PLUGINS_STORE_DIR, f"{plugin_id}_{file.filename}")
     with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+        while chunk := await file.read(1024 * 1024):
+            f.write(chunk)
     
     # 更新插件列表
     plugins = get_all_plugins()
@@ -288,36 +349,34 @@ def install_plugin(
     if not plugin:
         raise HTTPException(status_code=404, detail="Plugin not found")
     
-    # 检查是否已安装
+    # 检查是否已安装（集合查找）
     installed_plugins = get_installed_plugins()
-    if any(p["id"] == plugin_id for p in installed_plugins):
+    if plugin_id in {p["id"] for p in installed_plugins}:
         return {"success": True, "message": "Plugin already installed"}
     
     # 尝试复制插件文件到安装目录
-    src_pattern = os.path.join(settings.PLUGINS_DIR, "store", f"{plugin_id}_*")
-    import glob
-    src_files = glob.glob(src_pattern)
+    src_files = _find_by_prefix(PLUGINS_STORE_DIR, f"{plugin_id}_")
     
     # 如果存在实际文件，则复制；否则创建一个空的占位文件
     if src_files:
         src_file = src_files[0]
         filename = os.path.basename(src_file)
-        dest_file = os.path.join(settings.PLUGINS_DIR, "installed", filename)
+        dest_file = os.path.join(PLUGINS_INSTALLED_DIR, filename)
         
         try:
             shutil.copy2(src_file, dest_file)
         except Exception as e:
             # 记录错误但不中断流程
-            print(f"警告: 复制插件文件失败: {str(e)}")
+            logger.warning("复制插件文件失败: %s", e)
     else:
         # 创建一个空的占位文件，这样未来可以检测到它已被安装
         placeholder_filename = f"{plugin_id}_placeholder.txt"
-        dest_file = os.path.join(settings.PLUGINS_DIR, "installed", placeholder_filename)
+        dest_file = os.path.join(PLUGINS_INSTALLED_DIR, placeholder_filename)
         try:
             with open(dest_file, 'w') as f:
                 f.write(f"Placeholder for plugin: {plugin['name']} (ID: {plugin_id})")
         except Exception as e:
-            print(f"警告: 创建占位文件失败: {str(e)}")
+            logger.warning("创建占位文件失败: %s", e)
     
     # 更新已安装插件列表
     plugin_copy = plugin.copy()
@@ -325,11 +384,9 @@ def install_plugin(
     installed_plugins.append(plugin_copy)
     save_installed_plugins(installed_plugins)
     
-    # 更新下载计数
-    for p in all_plugins:
-        if p["id"] == plugin_id:
-            p["downloads"] += 1
-            p["updatedAt"] = datetime.now().isoformat()
+    # 更新下载计数（复用前面找到的插件引用，避免再次扫描列表）
+    plugin["downloads"] += 1
+    plugin["updatedAt"] = datetime.now().isoformat()
     save_plugins(all_plugins)
     
     return {"success": True, "message": "Plugin installed successfully"}
@@ -354,9 +411,7 @@ def uninstall_plugin(
         raise HTTPException(status_code=404, detail="Plugin not installed")
     
     # 尝试删除插件文件
-    pattern = os.path.join(settings.PLUGINS_DIR, "installed", f"{plugin_id}_*")
-    import glob
-    files = glob.glob(pattern)
+    files = _find_by_prefix(PLUGINS_INSTALLED_DIR, f"{plugin_id}_")
     
     # 如果存在文件则删除
     file_deleted = False
@@ -366,14 +421,14 @@ def uninstall_plugin(
                 os.remove(file)
                 file_deleted = True
             except Exception as e:
-                print(f"警告: 删除插件文件失败: {str(e)}")
+                logger.warning("删除插件文件失败: %s", e)
     
     # 即使没有找到文件也继续处理
     if not file_deleted:
-        print(f"警告: 未找到插件文件: {plugin_id}")
+        logger.warning("未找到插件文件: %s", plugin_id)
     
-    # 更新已安装插件列表
-    installed_plugins = [p for p in installed_plugins if p["id"] != plugin_id]
+    # 更新已安装插件列表（复用前面找到的插件引用，避免重建列表）
+    installed_plugins.remove(plugin)
     save_installed_plugins(installed_plugins)
     
     return {"success": True, "message": "Plugin uninstalled successfully"}
@@ -390,41 +445,30 @@ def search_repository(
     从仓库搜索插件
     """
     init_plugin_dirs()
-    
-    # 获取所有插件和已安装插件ID
-    all_plugins = get_all_plugins()
-    installed_ids = [p["id"] for p in get_installed_plugins()]
-    
-    # 准备插件列表
-    repo_plugins = []
-    
+
+    # 通过倒排索引筛选，避免每次请求对所有插件逐字段扫描
+    all_plugins, tag_index, repo_index = _get_store_indexes()
+    installed_ids = {p["id"] for p in get_installed_plugins()}
+
     # 特殊情况: 当repository_url为"all"或为空时，返回所有插件
     if not repository_url or repository_url.lower() == "all":
-        for plugin in all_plugins:
-            plugin_copy = plugin.copy()
-            plugin_copy["isInstalled"] = plugin["id"] in installed_ids
-            repo_plugins.append(plugin_copy)
+        candidates = set(range(len(all_plugins)))
     else:
-        # 根据仓库URL过滤插件
-        for plugin in all_plugins:
-            # 检查插件是否有repository字段，并且值匹配
-            if "repository" in plugin and plugin["repository"] == repository_url:
-                # 复制插件数据并标记安装状态
-                plugin_copy = plugin.copy()
-                plugin_copy["isInstalled"] = plugin["id"] in installed_ids
-                repo_plugins.append(plugin_copy)
-    
-    # 搜索
-    if query:
-        query = query.lower()
-        repo_plugins = [
-            p for p in repo_plugins
-            if (
-                query in p["name"].lower() or
-                query in p["description"].lower() or
-                query in p["author"].lower() or
-                any(query in tag.lower() for tag in p["tags"])
-            )
+        candidates = repo_index.get(repository_url, set())
+
+    # 搜索：查询词取集合交集
+    if query and candidates:
+        token_sets = [
+            tag_index.get(token, set())
+            for token in re.findall(r"\w+", query.lower())
         ]
-    
+        if token_sets:
+            candidates = candidates.intersection(*token_sets)
+
+    repo_plugins = []
+    for i in sorted(candidates):
+        plugin_copy = all_plugins[i].copy()
+        plugin_copy["isInstalled"] = plugin_copy["id"] in installed_ids
+        repo_plugins.append(plugin_copy)
+
     return repo_plugins 
\ No newline at end of file
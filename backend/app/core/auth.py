@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional, Union
-from jose import JWTError, jwt
+import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -9,7 +9,7 @@ import secrets
 import pyotp
 
 from app.core.config import settings
-from app.core.security import verify_password
+from app.core.security import ALGORITHM, verify_password
 from app.core.email import send_email
 from app.models.user import User
 from app.schemas.token import TokenPayload
@@ -19,6 +19,16 @@ from app.crud.user import user as user_crud
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Token encode/decode configuration resolved once at import so every
+# call avoids settings lookups and a fresh list allocation per decode
+_KEY = settings.SECRET_KEY
+_ALG = ALGORITHM
+_ALGS = [ALGORITHM]
+
+
+def _validate_token(payload: Dict[str, Any]) -> TokenPayload:
+    return TokenPayload(sub=payload.get("sub"), exp=payload.get("exp"))
+
 
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
@@ -28,7 +38,7 @@ def create_access_token(subject: Union[str, Any], expires_delta: Optional[timede
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject), "type": "access"}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _KEY, algorithm=_ALG)
     return encoded_jwt
 
 
@@ -36,15 +46,15 @@ def create_refresh_token(subject: Union[str, Any]) -> str:
     """Create JWT refresh token"""
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _KEY, algorithm=_ALG)
     return encoded_jwt
 
 
 def verify_refresh_token(token: str) -> Optional[str]:
     """Verify refresh token and return user ID"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        token_data = TokenPayload(**payload)
+        payload = jwt.decode(token, _KEY, algorithms=_ALGS)
+        token_data = _validate_token(payload)
         
         if token_data.type != "refresh":
             raise HTTPException(
@@ -53,7 +63,7 @@ def verify_refresh_token(token: str) -> Optional[str]:
             )
         
         return token_data.sub
-    except JWTError:
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
@@ -72,8 +82,8 @@ def generate_password_reset_token(email: str) -> str:
             "sub": email,
             "type": "password_reset"
         },
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM,
+        _KEY,
+        algorithm=_ALG,
     )
     return encoded_jwt
 
@@ -81,8 +91,8 @@ def generate_password_reset_token(email: str) -> str:
 def verify_password_reset_token(token: str) -> Optional[str]:
     """Verify password reset token and return email"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        token_data = TokenPayload(**payload)
+        payload = jwt.decode(token, _KEY, algorithms=_ALGS)
+        token_data = _validate_token(payload)
         
         if token_data.type != "password_reset":
             raise HTTPException(
@@ -91,7 +101,7 @@ def verify_password_reset_token(token: str) -> Optional[str]:
             )
         
         return token_data.sub
-    except JWTError:
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
@@ -135,8 +145,8 @@ def verify_totp(secret: str, token: str) -> bool:
 def get_current_user(db: Session, token: str) -> User:
     """Get current user from JWT token"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        token_data = TokenPayload(**payload)
+        payload = jwt.decode(token, _KEY, algorithms=_ALGS)
+        token_data = _validate_token(payload)
         
         if token_data.type != "access":
             raise HTTPException(
@@ -144,7 +154,7 @@ def get_current_user(db: Session, token: str) -> User:
                 detail="Invalid token type"
             )
         
-    except JWTError:
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
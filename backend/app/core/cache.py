@@ -0,0 +1,58 @@
+"""Small read-through cache for hot lookups.
+
+Backed by Redis when settings.REDIS_URL is configured, so entries are
+shared across workers; otherwise falls back to a per-process TTL dict so
+single-worker deployments still benefit without extra infrastructure.
+"""
+import json
+import threading
+import time
+from typing import Any, Optional
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+_redis_client = None
+if settings.REDIS_URL and redis is not None:
+    _redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+_local_cache: dict = {}
+_local_lock = threading.Lock()
+
+
+def cache_get(key: str) -> Optional[Any]:
+    """Get a cached JSON value, or None on miss/expiry"""
+    if _redis_client is not None:
+        value = _redis_client.get(key)
+        return json.loads(value) if value is not None else None
+    with _local_lock:
+        entry = _local_cache.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del _local_cache[key]
+            return None
+        return value
+
+
+def cache_set(key: str, value: Any, ttl: int) -> None:
+    """Cache a JSON-serializable value for ttl seconds"""
+    if _redis_client is not None:
+        _redis_client.set(key, json.dumps(value), ex=ttl)
+        return
+    with _local_lock:
+        _local_cache[key] = (value, time.monotonic() + ttl)
+
+
+def cache_delete(key: str) -> None:
+    """Invalidate a cached value"""
+    if _redis_client is not None:
+        _redis_client.delete(key)
+        return
+    with _local_lock:
+        _local_cache.pop(key, None)
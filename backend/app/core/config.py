@@ -1,13 +1,21 @@
 from typing import Any, Dict, List, Optional, Union
 from pydantic import AnyHttpUrl, EmailStr, PostgresDsn, validator
 from pydantic_settings import BaseSettings
+from pathlib import Path
+from types import SimpleNamespace
 import os
 import secrets
 
+# Repository-level plugins directory, resolved once at import
+_PLUGINS_DIR_DEFAULT = str(Path(__file__).resolve().parents[2] / "plugins")
+
 
 class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
+    # bcrypt work factor; lower it for deployments dominated by
+    # service-to-service auth where the default ~100ms/hash is too costly
+    BCRYPT_ROUNDS: int = 12
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30  # 30 days
     PROJECT_NAME: str = "ASA Dialog + MCP System"
@@ -57,6 +65,10 @@ class Settings(BaseSettings):
     # Query Performance Monitoring
     SLOW_QUERY_THRESHOLD: float = 1.0  # seconds
     ENABLE_QUERY_TRACKING: bool = True
+
+    # Cache Configuration (falls back to an in-process cache when unset)
+    REDIS_URL: Optional[str] = None
+    CONVERSATION_CACHE_TTL: int = 30  # seconds
     
     # Environment
     ENVIRONMENT: str = "development"
@@ -92,6 +104,11 @@ class Settings(BaseSettings):
     MAX_TOKENS: int = 2000
     DEFAULT_TEMPERATURE: float = 0.7
     AVAILABLE_MODELS: List[str] = ["gpt-4o-mini", "gpt-3.5-turbo"]
+    MAX_ACTIVE_CHAINS: int = 1000  # Max in-memory conversation chains per worker
+    # Per-call upper bounds so a stalled provider fails into retry/fallback
+    # instead of holding the request open indefinitely
+    LLM_REQUEST_TIMEOUT: float = 15.0  # seconds, non-streaming completion
+    LLM_STREAM_FIRST_CHUNK_TIMEOUT: float = 30.0  # seconds until first streamed token
     
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
@@ -102,11 +119,22 @@ class Settings(BaseSettings):
     USERS_OPEN_REGISTRATION: bool = True
     
     # MCP插件目录
-    PLUGINS_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "plugins")
+    PLUGINS_DIR: str = _PLUGINS_DIR_DEFAULT
     
     class Config:
         case_sensitive = True
         env_file = ".env"
 
 
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
+
+# Frozen snapshot of the resolved settings. Attribute reads on a plain
+# namespace skip pydantic's model machinery, which adds up for values
+# read on every request (SECRET_KEY and friends on the auth path).
+S = SimpleNamespace(**settings.model_dump())
+
+# Finished forms of values whose validators produce rich objects: the
+# DSN is stringified once here instead of per str() call at the engine
+# factories, and the CORS origins become a frozenset for O(1) checks.
+DB_URI: str = str(settings.SQLALCHEMY_DATABASE_URI)
+CORS_ORIGINS = frozenset(str(origin) for origin in settings.BACKEND_CORS_ORIGINS) 
\ No newline at end of file
@@ -1,14 +1,13 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
+import jwt
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app.core import security
-from app.core.config import settings
+from app.core.config import S, settings
 from app.crud import crud_user
-from app.db.session import SessionLocal
+from app.db.session import get_db
 from app.models.user import User
 from app.schemas.token import TokenPayload
 
@@ -16,34 +15,39 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
+# Decode configuration frozen at import: no per-request list allocation
+_ALGS = [security.ALGORITHM]
 
-def get_db() -> Generator:
-    try:
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
+
+def _validate_token(payload: dict) -> TokenPayload:
+    return TokenPayload(sub=payload.get("sub"), exp=payload.get("exp"))
 
 
 def get_current_user(
+    request: Request,
     db: Session = Depends(get_db),
     token: str = Depends(reusable_oauth2)
 ) -> User:
+    # Memoize on the request so the JWT is decoded and the user fetched
+    # at most once per request, whichever dependencies resolve it
+    cached_user = getattr(request.state, "current_user", None)
+    if cached_user is not None:
+        return cached_user
+
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
+        payload = jwt.decode(token, S.SECRET_KEY, algorithms=_ALGS)
+        token_data = _validate_token(payload)
+    except (jwt.PyJWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = crud_user.get(db, id=token_data.sub)
+    # Short-TTL cache: skips the user SELECT on most authenticated
+    # requests; user CRUD writes invalidate the entry
+    user = crud_user.user.get_cached(db, id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    request.state.current_user = user
     return user
 
 
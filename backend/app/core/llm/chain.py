@@ -3,27 +3,108 @@ from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
-from langchain.memory import ConversationBufferWindowMemory
-from tenacity import retry, stop_after_attempt, wait_exponential
+from collections import deque
+import asyncio
+import hashlib
 import json
 import os
 import glob
+import random
+import threading
+import time
 import httpx
 
 from app.core.llm.providers import get_llm_provider, get_fallback_model
 from app.core.llm.streaming import StreamingCallbackHandler
 from app.core.config import settings
+from app.core.logging import logger
+
+
+# 插件调用共用一个AsyncClient，复用keep-alive连接，
+# 避免每次调用都重新做TCP/TLS握手
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=30),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """应用关闭时释放共享客户端（在FastAPI shutdown钩子中调用）"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+# 响应缓存：相同(模型, 系统提示, 历史, 消息)组合在TTL内直接复用上次的
+# 回答，省掉一次上游API调用；插件处理的结果不缓存
+_response_cache: Dict[str, tuple] = {}
+_RESPONSE_CACHE_TTL = 3600.0
+_RESPONSE_CACHE_MAXSIZE = 10000
+
+# 主模型+fallback合计的尝试上限，以及视为暂时性、值得重试的错误
+_MAX_GENERATE_ATTEMPTS = 5
+_TRANSIENT_ERRORS = (
+    httpx.TimeoutException,
+    httpx.TransportError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def _response_cache_key(model_name, system_prompt, history, message) -> str:
+    payload = json.dumps(
+        {
+            "model": model_name,
+            "sys": system_prompt,
+            "hist": [(m.type, m.content) for m in history],
+            "msg": message,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# installed.json解析结果缓存，按mtime失效：每次消息只需一次os.stat，
+# 不用重复读盘和解析JSON
+_plugins_cache: Optional[tuple] = None
+_plugins_cache_lock = threading.Lock()
 
 
 # 获取已安装的MCP插件列表
 def get_installed_plugins():
+    global _plugins_cache
     installed_file = os.path.join(settings.PLUGINS_DIR, "installed.json")
     try:
-        with open(installed_file, "r") as f:
-            return json.load(f)
-    except:
+        mtime = os.stat(installed_file).st_mtime
+    except FileNotFoundError:
         return []
 
+    cached = _plugins_cache
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _plugins_cache_lock:
+        # 拿到锁后重查，避免并发时重复解析
+        cached = _plugins_cache
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(installed_file, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return []
+        _plugins_cache = (mtime, data)
+        return data
+
 
 class ConversationChain:
     def __init__(
@@ -32,139 +113,262 @@ class ConversationChain:
         memory_size: int = 10,
         system_prompt: Optional[str] = None,
         user_id: Optional[int] = None,
+        request_timeout: Optional[float] = None,
+        stream_request_timeout: Optional[float] = None,
         **kwargs
     ):
         self.model_name = model_name
-        self.provider = get_llm_provider(model_name, streaming=True, **kwargs)
-        self.memory = ConversationBufferWindowMemory(
-            k=memory_size,
-            return_messages=True,
-            output_key="answer",
+        self.request_timeout = request_timeout or settings.LLM_REQUEST_TIMEOUT
+        self.stream_request_timeout = (
+            stream_request_timeout or settings.LLM_STREAM_FIRST_CHUNK_TIMEOUT
         )
+        self.provider = get_llm_provider(model_name, streaming=True, **kwargs)
+        # 滑动窗口历史：保留最近memory_size轮（人/AI各一条），
+        # deque的maxlen让追加自动淘汰最旧消息，读写都是O(1)
+        self.history = deque(maxlen=max(memory_size, 1) * 2)
+        # 同步维护的序列化历史（插件请求体直接使用），每轮只追加
+        # 两条dict，省掉每次调用插件时O(N)的重建和isinstance判断
+        self._history_serialized = deque(maxlen=max(memory_size, 1) * 2)
         self.user_id = user_id
-        
+        self.system_prompt = system_prompt or "You are a helpful AI assistant."
+
         # Set up the conversation prompt
         self.prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt or "You are a helpful AI assistant."),
+            ("system", self.system_prompt),
             MessagesPlaceholder(variable_name="history"),
             ("human", "{input}"),
         ])
 
-    async def call_mcp_plugins(self, user_message: str, conversation_history: List) -> Optional[str]:
-        """尝试调用已安装的MCP插件处理用户消息"""
-        # 获取已安装的插件
-        plugins = get_installed_plugins()
-        if not plugins:
-            return None
-        
-        # 准备对话历史
-        history = []
-        for msg in conversation_history:
-            history.append({
-                "role": "assistant" if isinstance(msg, AIMessage) else "user",
-                "content": msg.content
-            })
-        
-        # 构建请求数据
-        request_data = {
+    def _remember(self, message: str, response_text: str) -> None:
+        """把一轮对话同时写入消息对象历史和序列化历史"""
+        self.history.append(HumanMessage(content=message))
+        self.history.append(AIMessage(content=response_text))
+        self._history_serialized.append({"role": "user", "content": message})
+        self._history_serialized.append({"role": "assistant", "content": response_text})
+
+    def _build_plugin_request(self, user_message: str) -> Dict:
+        """构建插件调用的请求体（历史直接取增量维护的序列化副本）"""
+        return {
             "message": user_message,
-            "history": history,
+            "history": list(self._history_serialized),
             "model": self.model_name,
             "user_id": self.user_id
         }
-        
-        # 对每个插件尝试调用
-        for plugin in plugins:
-            try:
-                # 查找插件服务地址
-                if "repository" not in plugin or not plugin["repository"]:
-                    continue
-                
-                # 根据plugin类型确定API端点
-                plugin_api_url = f"{plugin['repository']}/api/plugin/{plugin['id']}/invoke"
-                
-                # 发送请求到插件服务
-                print(f"调用MCP插件: {plugin['name']} ({plugin_api_url})")
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        plugin_api_url,
-                        json=request_data,
-                        headers={"Content-Type": "application/json"}
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        if result.get("success") and result.get("data"):
-                            print(f"MCP插件 {plugin['name']} 处理成功")
-                            # 添加MCP插件标记到响应中
-                            return f"[由MCP插件 {plugin['name']} 处理] {result['data']}"
-                        else:
-                            print(f"MCP插件 {plugin['name']} 处理失败: 没有有效的数据返回")
-                    else:
-                        print(f"MCP插件 {plugin['name']} 调用失败: {response.status_code}")
-            
-            except Exception as e:
-                print(f"调用MCP插件 {plugin['name']} 时出错: {str(e)}")
-                continue
-        
+
+    async def call_mcp_plugins(self, user_message: str) -> Optional[str]:
+        """尝试调用已安装的MCP插件处理用户消息"""
+        # 获取已安装的插件（放到线程池里执行，stat/读盘不阻塞事件循环；
+        # 命中mtime缓存时线程跳转只剩一次os.stat的开销）
+        plugins = await asyncio.to_thread(get_installed_plugins)
+        if not plugins:
+            return None
+
+        # 构建请求数据
+        request_data = self._build_plugin_request(user_message)
+
+        # 过滤掉没有服务地址的插件
+        candidates = [p for p in plugins if p.get("repository")]
+        if not candidates:
+            return None
+
+        # 并发探测所有插件：耗时从各插件延迟之和降到最慢一个，
+        # 取最先成功的结果并取消其余任务
+        tasks = [
+            asyncio.create_task(self._try_plugin(plugin, request_data))
+            for plugin in candidates
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                if result is not None:
+                    return result
+        finally:
+            for task in tasks:
+                task.cancel()
+
         # 所有插件都处理失败，返回None
         return None
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry_error_callback=lambda retry_state: retry_state.outcome.result()
-    )
+    def _mark_cache_breakpoints(self, prompt_value) -> None:
+        """在系统消息和倒数第二条消息上打cache_control断点。
+
+        只有声明supports_cache_control的提供商才会收到标记；稳定的
+        前缀（系统提示+历史）命中提供商侧的prompt cache可以显著降低
+        多轮对话的token成本和首字延迟。
+        """
+        if not getattr(self.provider, "supports_cache_control", False):
+            return
+        messages = prompt_value.to_messages()
+        if not messages:
+            return
+        messages[0].additional_kwargs["cache_control"] = {"type": "ephemeral"}
+        if len(messages) >= 3:
+            messages[-2].additional_kwargs["cache_control"] = {"type": "ephemeral"}
+
+    async def _try_plugin(self, plugin: Dict, request_data: Dict) -> Optional[str]:
+        """调用单个插件；任何失败都返回None，不让异常中断并发探测"""
+        try:
+            # 根据plugin类型确定API端点
+            plugin_api_url = f"{plugin['repository']}/api/plugin/{plugin['id']}/invoke"
+
+            # 发送请求到插件服务
+            logger.debug("调用MCP插件: %s (%s)", plugin["name"], plugin_api_url)
+            client = get_http_client()
+            response = await client.post(
+                plugin_api_url,
+                json=request_data,
+                headers={"Content-Type": "application/json"}
+            )
+
+            if response.status_code == 200:
+                result = response.json()
+                if result.get("success") and result.get("data"):
+                    logger.debug("MCP插件 %s 处理成功", plugin["name"])
+                    # 添加MCP插件标记到响应中
+                    return f"[由MCP插件 {plugin['name']} 处理] {result['data']}"
+                else:
+                    logger.debug("MCP插件 %s 处理失败: 没有有效的数据返回", plugin["name"])
+            else:
+                logger.warning("MCP插件 %s 调用失败: %s", plugin["name"], response.status_code)
+
+        except Exception as e:
+            logger.warning("调用MCP插件 %s 时出错: %s", plugin["name"], e)
+
+        return None
+
+    async def _stream_plugin(self, plugin: Dict, request_data: Dict) -> AsyncGenerator[str, None]:
+        """流式调用单个插件，文本块按到达顺序产出。
+
+        插件返回application/json信封时退回整体解析（旧协议兼容）；
+        其他内容类型逐块透传，插件处理的轮次首字延迟与原生LLM流式
+        一致，不再等整个响应体下载完。
+        """
+        plugin_api_url = f"{plugin['repository']}/api/plugin/{plugin['id']}/invoke"
+        logger.debug("调用MCP插件: %s (%s)", plugin["name"], plugin_api_url)
+        client = get_http_client()
+        async with client.stream(
+            "POST",
+            plugin_api_url,
+            json=request_data,
+            headers={"Content-Type": "application/json"},
+        ) as response:
+            if response.status_code != 200:
+                logger.warning("MCP插件 %s 调用失败: %s", plugin["name"], response.status_code)
+                return
+
+            content_type = response.headers.get("content-type", "")
+            if content_type.startswith("application/json"):
+                result = json.loads(await response.aread())
+                if result.get("success") and result.get("data"):
+                    logger.debug("MCP插件 %s 处理成功", plugin["name"])
+                    yield f"[由MCP插件 {plugin['name']} 处理] {result['data']}"
+                else:
+                    logger.debug("MCP插件 %s 处理失败: 没有有效的数据返回", plugin["name"])
+                return
+
+            first = True
+            async for chunk in response.aiter_text():
+                if not chunk:
+                    continue
+                if first:
+                    # 添加MCP插件标记到响应中
+                    yield f"[由MCP插件 {plugin['name']} 处理] "
+                    first = False
+                yield chunk
+
+    # 指数退避加随机抖动，避免并发429重试同步成波；只重试网络/超时
+    # 这类暂时性错误，认证、参数类错误直接失败
+    async def _invoke_model(self, history: List, message: str) -> str:
+        """走一次完整的prompt构建+模型调用"""
+        messages = await self.prompt.ainvoke({
+            "history": history,
+            "input": message
+        })
+        self._mark_cache_breakpoints(messages)
+        response = await asyncio.wait_for(
+            self.provider.model.ainvoke(messages),
+            timeout=self.request_timeout,
+        )
+        return response.content
+
     async def generate_response(
         self,
         message: str,
     ) -> str:
-        """Generate a complete response for the given message"""
-        try:
-            # 获取对话历史
-            history = self.memory.load_memory_variables({})["history"]
-            
-            # 尝试调用MCP插件处理
-            plugin_response = await self.call_mcp_plugins(message, history)
-            if plugin_response:
-                # 如果插件处理成功，使用插件的响应
-                response_text = plugin_response
-                
-                # 保存到对话历史
-                self.memory.save_context(
-                    {"input": message},
-                    {"answer": response_text}
-                )
-                
-                return response_text
-            
-            # 如果没有插件处理，使用正常流程
-            # Generate messages from prompt
-            messages = await self.prompt.ainvoke({
-                "history": history,
-                "input": message
-            })
-            
-            # Generate response
-            response = await self.provider.model.ainvoke(messages)
-            response_text = response.content
-            
-            # Save to memory
-            self.memory.save_context(
-                {"input": message},
-                {"answer": response_text}
-            )
-            
+        """Generate a complete response for the given message
+
+        主模型和fallback模型共享一个累计尝试预算：之前tenacity的
+        重试和fallback的递归调用相乘，最坏要打9次上游；现在全部
+        尝试加起来不超过_MAX_GENERATE_ATTEMPTS次。
+        """
+        # 获取对话历史
+        history = list(self.history)
+
+        # 尝试调用MCP插件处理
+        plugin_response = await self.call_mcp_plugins(message)
+        if plugin_response:
+            # 如果插件处理成功，使用插件的响应
+            response_text = plugin_response
+
+            # 保存到对话历史
+            self._remember(message, response_text)
+
             return response_text
-            
-        except Exception as e:
-            # Try fallback model if available
-            fallback_model = get_fallback_model(self.model_name)
-            if fallback_model:
-                self.model_name = fallback_model
-                self.provider = get_llm_provider(fallback_model)
-                return await self.generate_response(message)
-            raise e
+
+        # 如果没有插件处理，先查响应缓存
+        cache_key = _response_cache_key(
+            self.model_name, self.system_prompt, history, message
+        )
+        cached = _response_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < _RESPONSE_CACHE_TTL:
+            response_text = cached[1]
+            self._remember(message, response_text)
+            return response_text
+
+        # 候选模型：主模型 + fallback（若配置）
+        candidates = [self.model_name]
+        fallback_model = get_fallback_model(self.model_name)
+        if fallback_model:
+            candidates.append(fallback_model)
+
+        last_error: Optional[Exception] = None
+        attempt = 0
+        for model_name in candidates:
+            if model_name != self.model_name:
+                # 切换到fallback模型，继续消耗同一预算
+                self.model_name = model_name
+                self.provider = get_llm_provider(model_name, streaming=True)
+
+            while attempt < _MAX_GENERATE_ATTEMPTS:
+                attempt += 1
+                try:
+                    response_text = await self._invoke_model(history, message)
+
+                    # 写入缓存，超出容量时淘汰最旧条目
+                    if len(_response_cache) >= _RESPONSE_CACHE_MAXSIZE:
+                        _response_cache.pop(next(iter(_response_cache)), None)
+                    _response_cache[cache_key] = (time.monotonic(), response_text)
+
+                    # Save to memory
+                    self._remember(message, response_text)
+
+                    return response_text
+                except _TRANSIENT_ERRORS as e:
+                    # 暂时性错误：指数退避+抖动后在当前模型上重试
+                    last_error = e
+                    logger.warning("生成响应第%d次尝试失败 (model=%s): %s", attempt, self.model_name, e)
+                    if attempt < _MAX_GENERATE_ATTEMPTS:
+                        delay = min(2 ** (attempt - 1), 60) + random.uniform(0, 2)
+                        await asyncio.sleep(delay)
+                except Exception as e:
+                    # 不可重试的错误：换下一个候选模型，不在当前模型上耗预算
+                    last_error = e
+                    logger.error("生成响应失败 (model=%s): %s", self.model_name, e)
+                    break
+            if attempt >= _MAX_GENERATE_ATTEMPTS:
+                break
+
+        raise last_error
 
     async def astream_response(
         self,
@@ -173,20 +377,33 @@ class ConversationChain:
         """Stream the response for the given message"""
         try:
             # Get conversation history
-            history = self.memory.load_memory_variables({})["history"]
-            
-            # 尝试调用MCP插件处理
-            plugin_response = await self.call_mcp_plugins(message, history)
-            if plugin_response:
-                # 如果插件处理成功，直接返回插件的响应
-                yield plugin_response
-                
-                # 保存到对话历史
-                self.memory.save_context(
-                    {"input": message},
-                    {"answer": plugin_response}
-                )
-                return
+            history = list(self.history)
+
+            # 尝试流式调用MCP插件处理：依次尝试候选插件，
+            # 第一个产出内容的插件获胜（块已经发给客户端，无法换人）
+            plugins = await asyncio.to_thread(get_installed_plugins)
+            candidates = [p for p in plugins if p.get("repository")]
+            if candidates:
+                request_data = self._build_plugin_request(message)
+                for plugin in candidates:
+                    # 逐块append，结束后join一次：字符串+=在长回复上是O(N²)
+                    plugin_parts: List[str] = []
+                    try:
+                        async for delta in self._stream_plugin(plugin, request_data):
+                            plugin_parts.append(delta)
+                            yield delta
+                    except Exception as e:
+                        logger.warning("调用MCP插件 %s 时出错: %s", plugin["name"], e)
+                        if plugin_parts:
+                            # 已经发出部分内容，只能在此结束
+                            break
+                        continue
+                    if plugin_parts:
+                        break
+                if plugin_parts:
+                    # 保存到对话历史
+                    self._remember(message, "".join(plugin_parts))
+                    return
             
             # 如果没有插件处理，使用正常流程
             # Generate messages from prompt
@@ -194,30 +411,43 @@ class ConversationChain:
                 "history": history,
                 "input": message
             })
+            self._mark_cache_breakpoints(messages)
             
-            # Initialize variables for tracking the response
-            response_text = ""
-            
-            # Stream the response directly from the model
-            async for chunk in self.provider.model.astream(messages):
+            # Collect chunks in a list and join once at the end: repeated
+            # string concatenation is quadratic over long responses
+            parts: List[str] = []
+
+            # Stream the response directly from the model.
+            # 只对首块设超时：卡死的提供商尽快走fallback，
+            # 已经开始产出的流不再强加上限
+            iterator = self.provider.model.astream(messages).__aiter__()
+            try:
+                chunk = await asyncio.wait_for(
+                    iterator.__anext__(), timeout=self.stream_request_timeout
+                )
+            except StopAsyncIteration:
+                chunk = None
+            while chunk is not None:
                 if hasattr(chunk, 'content') and chunk.content:
                     delta = chunk.content
-                    response_text += delta
+                    parts.append(delta)
                     yield delta
+                try:
+                    chunk = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
             
             # Save complete response to memory after streaming finishes
+            response_text = "".join(parts)
             if response_text:
-                self.memory.save_context(
-                    {"input": message},
-                    {"answer": response_text}
-                )
+                self._remember(message, response_text)
             
         except Exception as e:
-            print(f"Error in astream_response: {str(e)}")
+            logger.error("Error in astream_response: %s", e, exc_info=True)
             # Try fallback model if available
             fallback_model = get_fallback_model(self.model_name)
             if fallback_model:
-                print(f"Trying fallback model: {fallback_model}")
+                logger.info("Trying fallback model: %s", fallback_model)
                 self.model_name = fallback_model
                 self.provider = get_llm_provider(fallback_model, streaming=True)
                 async for chunk in self.astream_response(message):
@@ -229,15 +459,9 @@ class ConversationChain:
 
     def get_conversation_history(self) -> List[Dict]:
         """Get the conversation history from memory"""
-        history = self.memory.load_memory_variables({})["history"]
-        return [
-            {
-                "role": "assistant" if isinstance(msg, AIMessage) else "user",
-                "content": msg.content
-            }
-            for msg in history
-        ]
+        return list(self._history_serialized)
 
     def clear_memory(self):
         """Clear the conversation memory"""
-        self.memory.clear() 
\ No newline at end of file
+        self.history.clear()
+        self._history_serialized.clear() 
\ No newline at end of file
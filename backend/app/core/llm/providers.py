@@ -30,6 +30,12 @@ settings = get_settings()
 
 class LLMProvider:
     """Base class for LLM providers"""
+
+    # Whether the upstream API honours explicit cache_control breakpoints
+    # on messages (Anthropic-style). OpenAI and Gemini cache prompt
+    # prefixes implicitly, so the current providers leave this off.
+    supports_cache_control: bool = False
+
     def __init__(self, model_name: str, **kwargs):
         self.model_name = model_name
         self.kwargs = kwargs
@@ -105,6 +111,19 @@ MODEL_CONFIGS = {
 }
 
 
+@lru_cache(maxsize=64)
+def _cached_provider(model_key: str, kwargs_items: tuple) -> LLMProvider:
+    """One provider instance per (model, kwargs) across the process.
+
+    Instantiating the underlying chat model parses env, validates config
+    and builds an httpx client each time; reusing the instance also lets
+    that client pool connections across conversations.
+    """
+    config = MODEL_CONFIGS[model_key]
+    provider_class = config["provider_class"]
+    return provider_class(config["model_name"], **dict(kwargs_items))
+
+
 def get_llm_provider(model_name: str, **kwargs) -> LLMProvider:
     """Factory function to create LLM provider instances"""
     # Check for empty model name
@@ -115,21 +134,23 @@ def get_llm_provider(model_name: str, **kwargs) -> LLMProvider:
             raise ValueError("No models configured and empty model name provided")
         print(f"Empty model name provided, using default: {default_model}")
         model_name = default_model
-    
-    config = MODEL_CONFIGS.get(model_name)
-    if not config:
+
+    if model_name not in MODEL_CONFIGS:
         # Get first available model as fallback
         default_model = next(iter(MODEL_CONFIGS.keys()), None)
         if default_model:
             print(f"Unsupported model: {model_name}, falling back to {default_model}")
-            config = MODEL_CONFIGS.get(default_model)
-        
-        if not config:
+            model_name = default_model
+        else:
             available_models = ", ".join(MODEL_CONFIGS.keys())
             raise ValueError(f"Unsupported model: {model_name}. Available models: {available_models}")
-    
-    provider_class = config["provider_class"]
-    return provider_class(config["model_name"], **kwargs)
+
+    try:
+        return _cached_provider(model_name, tuple(sorted(kwargs.items())))
+    except TypeError:
+        # Unhashable kwargs value: fall back to a one-off instance
+        config = MODEL_CONFIGS[model_name]
+        return config["provider_class"](config["model_name"], **kwargs)
 
 
 def get_fallback_model(model_name: str) -> Optional[str]:
@@ -25,6 +25,9 @@ class StreamingCallbackHandler(AsyncCallbackHandler):
     async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
         """Run on new token"""
         if token:
+            # Keep the accumulated copy alongside the queue so
+            # get_accumulated_response actually returns the response
+            self.tokens.append(token)
             await self.queue.put(token)
 
     async def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
@@ -1,115 +1,126 @@
-from typing import Callable
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-import time
-from datetime import datetime
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import logging
+import orjson
 
-from app.core.config import settings
+from app.core.config import CORS_ORIGINS, settings
 from app.core.logging import logger
 
 
 # Rate limiter configuration
 limiter = Limiter(key_func=get_remote_address)
 
+# Static response headers, encoded once at import
+_SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+    (b"content-security-policy", b"default-src 'self'"),
+]
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to responses"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Content-Security-Policy"] = "default-src 'self'"
-        return response
 
+async def _send_json_error(send: Send, status_code: int, detail: str) -> None:
+    """Short-circuit a request with a small JSON error response"""
+    body = orjson.dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class SecurityHeadersMiddleware:
+    """Add security headers to responses.
+
+    Pure ASGI: BaseHTTPMiddleware spawns a task and a memory channel per
+    request, which this header-only middleware doesn't need.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-class RequestValidationMiddleware(BaseHTTPMiddleware):
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"].extend(_SECURITY_HEADERS)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class RequestValidationMiddleware:
     """Validate and sanitize incoming requests"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Log request details
-        logger.info(
-            "Request",
-            extra={
-                "path": request.url.path,
-                "method": request.method,
-                "client": request.client.host if request.client else None,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-        )
-        
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        client = scope.get("client")
+
+        # Log request details; the formatter stamps its own timestamp, and
+        # the level guard skips building the extra dict when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Request",
+                extra={
+                    "path": scope["path"],
+                    "method": scope["method"],
+                    "client": client[0] if client else None,
+                }
+            )
+
         # Validate content length
-        content_length = request.headers.get("content-length")
+        content_length = headers.get(b"content-length")
         if content_length and int(content_length) > settings.MAX_CONTENT_LENGTH:
-            return Response(
-                status_code=413,
-                content={"detail": "Request too large"}
-            )
-        
+            await _send_json_error(send, 413, "Request too large")
+            return
+
         # Validate content type for POST/PUT requests
-        if request.method in ["POST", "PUT"]:
-            content_type = request.headers.get("content-type", "")
-            if not content_type.startswith(("application/json", "multipart/form-data")):
-                return Response(
-                    status_code=415,
-                    content={"detail": "Unsupported media type"}
-                )
-        
+        if scope["method"] in ("POST", "PUT"):
+            content_type = headers.get(b"content-type", b"")
+            if not content_type.startswith((b"application/json", b"multipart/form-data")):
+                await _send_json_error(send, 415, "Unsupported media type")
+                return
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
         except Exception as e:
             logger.error(
                 "Request error",
                 extra={
-                    "path": request.url.path,
-                    "method": request.method,
+                    "path": scope["path"],
+                    "method": scope["method"],
                     "error": str(e),
                 }
             )
             raise
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    """Collect request metrics"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
-        
-        response = await call_next(request)
-        
-        # Calculate request duration
-        duration = time.time() - start_time
-        
-        # Log metrics
-        logger.info(
-            "Request metrics",
-            extra={
-                "path": request.url.path,
-                "method": request.method,
-                "status_code": response.status_code,
-                "duration": duration,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-        )
-        
-        return response
-
-
 def setup_security_middleware(app: FastAPI) -> None:
     """Configure all security middleware"""
     
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=[str(origin) for origin in settings.BACKEND_CORS_ORIGINS],
+        allow_origins=list(CORS_ORIGINS),
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
@@ -121,10 +132,10 @@ def setup_security_middleware(app: FastAPI) -> None:
         allowed_hosts=settings.ALLOWED_HOSTS,
     )
     
-    # Add custom security middleware
+    # Add custom security middleware; request metrics are handled by
+    # RequestTrackingMiddleware in app.core.middleware
     app.add_middleware(SecurityHeadersMiddleware)
     app.add_middleware(RequestValidationMiddleware)
-    app.add_middleware(MetricsMiddleware)
     
     # Add rate limiting
     app.state.limiter = limiter 
\ No newline at end of file
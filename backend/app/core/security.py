@@ -1,10 +1,18 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
-from typing import Any, Union
-from jose import jwt
+from typing import Any, Dict, Tuple, Union
+import jwt
 from passlib.context import CryptContext
-from app.core.config import settings
+from app.core.config import S, settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Module-level context so the bcrypt backend is resolved once at import;
+# the work factor is configurable instead of pinned at passlib's default
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
 
 ALGORITHM = "HS256"
 
@@ -16,15 +24,34 @@ def create_access_token(
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+            minutes=S.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, S.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+# Short-TTL memo over bcrypt verification. Retry storms and health
+# checks re-verify the same (password, hash) pair back to back; 5s is
+# short enough not to weaken bcrypt against offline attack but collapses
+# a burst to a single hash. Keys are sha256 digests, never the inputs.
+_VERIFY_CACHE_TTL = 5.0
+_VERIFY_CACHE_MAXSIZE = 1024
+_verify_cache: Dict[bytes, Tuple[float, bool]] = {}
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    key = hashlib.sha256(
+        plain_password.encode() + b"\x00" + hashed_password.encode()
+    ).digest()
+    entry = _verify_cache.get(key)
+    if entry is not None and time.monotonic() - entry[0] < _VERIFY_CACHE_TTL:
+        return entry[1]
+    result = pwd_context.verify(plain_password, hashed_password)
+    if len(_verify_cache) >= _VERIFY_CACHE_MAXSIZE:
+        _verify_cache.pop(next(iter(_verify_cache)), None)
+    _verify_cache[key] = (time.monotonic(), result)
+    return result
 
 
 def get_password_hash(password: str) -> str:
@@ -1,5 +1,6 @@
 from .crud_user import user
 from .crud_conversation import conversation
+from .mcp import mcp, mcp_installation, mcp_usage
 
 # For a new basic set of CRUD operations you could just do
 
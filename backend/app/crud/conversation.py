@@ -1,12 +1,32 @@
 from typing import List, Optional, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, insert, select, update
 from fastapi.encoders import jsonable_encoder
 
+from app.core.cache import cache_delete, cache_get, cache_set
+from app.core.config import settings
 from app.models.conversation import Conversation, Message
 from app.schemas.conversation import ConversationCreate, ConversationUpdate, MessageCreate
 
 
+def _conversation_cache_key(conversation_id: int, user_id: int) -> str:
+    return f"conversation:{user_id}:{conversation_id}"
+
+
+def _cache_conversation(conversation: Conversation, user_id: int) -> None:
+    cache_set(
+        _conversation_cache_key(conversation.id, user_id),
+        {
+            "id": conversation.id,
+            "user_id": conversation.user_id,
+            "title": conversation.title,
+            "model": conversation.model,
+        },
+        settings.CONVERSATION_CACHE_TTL,
+    )
+
+
 def get_conversation(db: Session, conversation_id: int, user_id: int) -> Optional[Conversation]:
     return db.query(Conversation).filter(
         Conversation.id == conversation_id,
@@ -14,12 +34,54 @@ def get_conversation(db: Session, conversation_id: int, user_id: int) -> Optiona
     ).first()
 
 
+def get_conversation_cached(
+    db: Session, conversation_id: int, user_id: int
+) -> Optional[Conversation]:
+    """Ownership/model lookup with a short-TTL cache for read-hot paths.
+
+    The returned object carries only the cached scalar fields, so use it
+    where the conversation is checked or its model read, not where the
+    full row (relationships, timestamps) is serialized.
+    """
+    cached = cache_get(_conversation_cache_key(conversation_id, user_id))
+    if cached is not None:
+        return Conversation(**cached)
+    conversation = get_conversation(db, conversation_id=conversation_id, user_id=user_id)
+    if conversation:
+        _cache_conversation(conversation, user_id)
+    return conversation
+
+
 def get_conversations(
-    db: Session, user_id: int, skip: int = 0, limit: int = 10
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 10,
+    updated_before: Optional[Any] = None,
 ) -> tuple[List[Conversation], int]:
     query = db.query(Conversation).filter(Conversation.user_id == user_id)
-    total = query.count()
-    items = query.order_by(desc(Conversation.updated_at)).offset(skip).limit(limit).all()
+    if updated_before is not None:
+        # Keyset pagination: continue from the cursor instead of scanning
+        # and discarding OFFSET rows on deep pages
+        total = query.count()
+        items = (
+            query.filter(Conversation.updated_at < updated_before)
+            .order_by(desc(Conversation.updated_at))
+            .limit(limit)
+            .all()
+        )
+    else:
+        # Fetch the page and the total in one round trip via a window count
+        rows = (
+            db.query(Conversation, func.count().over().label("total"))
+            .filter(Conversation.user_id == user_id)
+            .order_by(desc(Conversation.updated_at))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        items = [row[0] for row in rows]
+        total = rows[0][1] if rows else query.count()
     return items, total
 
 
@@ -44,20 +106,72 @@ def update_conversation(
         setattr(conversation, field, value)
     db.commit()
     db.refresh(conversation)
+    cache_delete(_conversation_cache_key(conversation.id, conversation.user_id))
+    return conversation
+
+
+def update_conversation_fields(
+    db: Session, conversation_id: int, user_id: int, update_data: ConversationUpdate
+) -> Optional[Conversation]:
+    """Apply an update with a single owner-scoped UPDATE ... RETURNING.
+
+    Folds the existence/ownership check into the UPDATE itself; returns
+    None when no row matched (missing or not owned by user_id).
+    """
+    values = update_data.model_dump(exclude_unset=True)
+    if not values:
+        return get_conversation(db, conversation_id=conversation_id, user_id=user_id)
+    conversation = db.execute(
+        update(Conversation)
+        .where(
+            Conversation.id == conversation_id,
+            Conversation.user_id == user_id
+        )
+        .values(**values)
+        .returning(Conversation)
+        .execution_options(synchronize_session=False)
+    ).scalars().first()
+    db.commit()
+    cache_delete(_conversation_cache_key(conversation_id, user_id))
     return conversation
 
 
 def delete_conversation(db: Session, conversation: Conversation) -> None:
+    cache_delete(_conversation_cache_key(conversation.id, conversation.user_id))
     db.delete(conversation)
     db.commit()
 
 
 def get_messages(
-    db: Session, conversation_id: int, skip: int = 0, limit: int = 50
+    db: Session,
+    conversation_id: int,
+    skip: int = 0,
+    limit: int = 50,
+    after_id: Optional[int] = None,
 ) -> tuple[List[Message], int]:
     query = db.query(Message).filter(Message.conversation_id == conversation_id)
-    total = query.count()
-    items = query.order_by(Message.created_at).offset(skip).limit(limit).all()
+    if after_id is not None:
+        # Keyset pagination on the id: ids are monotonic within a
+        # conversation, so this matches created_at order without OFFSET
+        total = query.count()
+        items = (
+            query.filter(Message.id > after_id)
+            .order_by(Message.id)
+            .limit(limit)
+            .all()
+        )
+    else:
+        # Fetch the page and the total in one round trip via a window count
+        rows = (
+            db.query(Message, func.count().over().label("total"))
+            .filter(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        items = [row[0] for row in rows]
+        total = rows[0][1] if rows else query.count()
     return items, total
 
 
@@ -69,17 +183,296 @@ def create_message(
         conversation_id=conversation_id
     )
     db.add(db_message)
-    
-    # Update conversation's updated_at timestamp
-    conversation = db.query(Conversation).filter(Conversation.id == conversation_id).first()
-    if conversation:
-        conversation.updated_at = db_message.created_at
-    
+    db.flush()
+
+    # Bump conversation's updated_at with a direct UPDATE instead of
+    # SELECTing the row just to patch one column
+    db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(updated_at=db_message.created_at)
+    )
+
     db.commit()
     db.refresh(db_message)
     return db_message
 
 
+def create_messages_and_bump(
+    db: Session, conversation_id: int, messages: List[MessageCreate]
+) -> List[Message]:
+    """Insert several messages with a single multi-row INSERT and bump the
+    conversation's updated_at in the same transaction.
+
+    Collapses the per-message INSERT + SELECT + UPDATE round trips into two
+    statements and one commit, which matters on the pre-stream path.
+    """
+    rows = [
+        {**message.model_dump(), "conversation_id": conversation_id}
+        for message in messages
+    ]
+    returned = db.execute(
+        insert(Message)
+        .values(rows)
+        .returning(Message.id, Message.created_at)
+    ).all()
+    db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(updated_at=returned[-1].created_at)
+    )
+    db.commit()
+    return [
+        Message(
+            id=row.id,
+            created_at=row.created_at,
+            conversation_id=conversation_id,
+            **message.model_dump()
+        )
+        for row, message in zip(returned, messages)
+    ]
+
+
+def update_message_content(db: Session, message_id: int, content: str) -> None:
+    """Update a message's content with a single UPDATE keyed by id."""
+    db.execute(
+        update(Message)
+        .where(Message.id == message_id)
+        .values(content=content)
+    )
+    db.commit()
+
+
 def delete_message(db: Session, message: Message) -> None:
     db.delete(message)
-    db.commit() 
\ No newline at end of file
+    db.commit()
+
+
+# Async variants so request handlers on the event loop never block on
+# database round trips; the sync functions above remain for script and
+# worker contexts that run outside the loop
+
+async def get_conversation_async(
+    db: AsyncSession, conversation_id: int, user_id: int
+) -> Optional[Conversation]:
+    result = await db.execute(
+        select(Conversation).where(
+            Conversation.id == conversation_id,
+            Conversation.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+
+async def get_conversation_cached_async(
+    db: AsyncSession, conversation_id: int, user_id: int
+) -> Optional[Conversation]:
+    """Async counterpart of get_conversation_cached."""
+    cached = cache_get(_conversation_cache_key(conversation_id, user_id))
+    if cached is not None:
+        return Conversation(**cached)
+    conversation = await get_conversation_async(
+        db, conversation_id=conversation_id, user_id=user_id
+    )
+    if conversation:
+        _cache_conversation(conversation, user_id)
+    return conversation
+
+
+async def get_conversations_async(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 10,
+    updated_before: Optional[Any] = None,
+) -> tuple[List[Conversation], Optional[int]]:
+    """Async counterpart of get_conversations.
+
+    Keyset pages (updated_before) skip the total entirely — a cursor
+    consumer is scrolling, not rendering page numbers — so no COUNT is
+    paid past the first page.
+    """
+    if updated_before is not None:
+        items = (
+            await db.execute(
+                select(Conversation)
+                .where(
+                    Conversation.user_id == user_id,
+                    Conversation.updated_at < updated_before,
+                )
+                .order_by(desc(Conversation.updated_at))
+                .limit(limit)
+            )
+        ).scalars().all()
+        return items, None
+
+    rows = (
+        await db.execute(
+            select(Conversation, func.count().over().label("total"))
+            .where(Conversation.user_id == user_id)
+            .order_by(desc(Conversation.updated_at))
+            .offset(skip)
+            .limit(limit)
+        )
+    ).all()
+    items = [row[0] for row in rows]
+    if rows:
+        total = rows[0][1]
+    else:
+        total = (
+            await db.execute(
+                select(func.count())
+                .select_from(Conversation)
+                .where(Conversation.user_id == user_id)
+            )
+        ).scalar() or 0
+    return items, total
+
+
+async def create_conversation_async(
+    db: AsyncSession, conversation: ConversationCreate, user_id: int
+) -> Conversation:
+    db_conversation = Conversation(
+        **conversation.model_dump(),
+        user_id=user_id
+    )
+    db.add(db_conversation)
+    await db.commit()
+    await db.refresh(db_conversation)
+    return db_conversation
+
+
+async def update_conversation_async(
+    db: AsyncSession, conversation: Conversation, update_data: ConversationUpdate
+) -> Conversation:
+    update_dict = update_data.model_dump(exclude_unset=True)
+    for field, value in update_dict.items():
+        setattr(conversation, field, value)
+    await db.commit()
+    await db.refresh(conversation)
+    cache_delete(_conversation_cache_key(conversation.id, conversation.user_id))
+    return conversation
+
+
+async def update_conversation_fields_async(
+    db: AsyncSession, conversation_id: int, user_id: int, update_data: ConversationUpdate
+) -> Optional[Conversation]:
+    """Async counterpart of update_conversation_fields."""
+    values = update_data.model_dump(exclude_unset=True)
+    if not values:
+        return await get_conversation_async(
+            db, conversation_id=conversation_id, user_id=user_id
+        )
+    conversation = (
+        await db.execute(
+            update(Conversation)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id
+            )
+            .values(**values)
+            .returning(Conversation)
+            .execution_options(synchronize_session=False)
+        )
+    ).scalars().first()
+    await db.commit()
+    cache_delete(_conversation_cache_key(conversation_id, user_id))
+    return conversation
+
+
+async def delete_conversation_async(db: AsyncSession, conversation: Conversation) -> None:
+    cache_delete(_conversation_cache_key(conversation.id, conversation.user_id))
+    await db.delete(conversation)
+    await db.commit()
+
+
+async def get_messages_async(
+    db: AsyncSession,
+    conversation_id: int,
+    skip: int = 0,
+    limit: int = 50,
+    after_id: Optional[int] = None,
+) -> tuple[List[Message], Optional[int]]:
+    """Async counterpart of get_messages.
+
+    Keyset pages (after_id) skip the COUNT; scrolling clients follow
+    the cursor and never render a page count.
+    """
+    if after_id is not None:
+        items = (
+            await db.execute(
+                select(Message)
+                .where(
+                    Message.conversation_id == conversation_id,
+                    Message.id > after_id,
+                )
+                .order_by(Message.id)
+                .limit(limit)
+            )
+        ).scalars().all()
+        return items, None
+
+    rows = (
+        await db.execute(
+            select(Message, func.count().over().label("total"))
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at)
+            .offset(skip)
+            .limit(limit)
+        )
+    ).all()
+    items = [row[0] for row in rows]
+    if rows:
+        total = rows[0][1]
+    else:
+        total = (
+            await db.execute(
+                select(func.count())
+                .select_from(Message)
+                .where(Message.conversation_id == conversation_id)
+            )
+        ).scalar() or 0
+    return items, total
+
+
+async def create_messages_and_bump_async(
+    db: AsyncSession, conversation_id: int, messages: List[MessageCreate]
+) -> List[Message]:
+    """Async counterpart of create_messages_and_bump."""
+    rows = [
+        {**message.model_dump(), "conversation_id": conversation_id}
+        for message in messages
+    ]
+    returned = (
+        await db.execute(
+            insert(Message)
+            .values(rows)
+            .returning(Message.id, Message.created_at)
+        )
+    ).all()
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(updated_at=returned[-1].created_at)
+    )
+    await db.commit()
+    return [
+        Message(
+            id=row.id,
+            created_at=row.created_at,
+            conversation_id=conversation_id,
+            **message.model_dump()
+        )
+        for row, message in zip(returned, messages)
+    ]
+
+
+async def update_message_content_async(
+    db: AsyncSession, message_id: int, content: str
+) -> None:
+    await db.execute(
+        update(Message)
+        .where(Message.id == message_id)
+        .values(content=content)
+    )
+    await db.commit() 
\ No newline at end of file
@@ -1,6 +1,5 @@
 from typing import List
 
-from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
@@ -12,8 +11,7 @@ class CRUDConversation(CRUDBase[Conversation, ConversationCreate, ConversationUp
     def create_with_user(
         self, db: Session, *, obj_in: ConversationCreate, user_id: int
     ) -> Conversation:
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data, user_id=user_id)
+        db_obj = self.model(**obj_in.model_dump(), user_id=user_id)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
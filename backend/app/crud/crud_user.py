@@ -1,5 +1,7 @@
-from typing import Any, Dict, Optional, Union
+import time
+from typing import Any, Dict, Optional, Tuple, Union
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.security import get_password_hash, verify_password
@@ -7,13 +9,36 @@ from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+# Auth-path cache: the user row is fetched on every authenticated
+# request but changes rarely; a short TTL saves the round-trip while
+# bounding staleness. Writes through update/remove invalidate directly.
+_USER_CACHE_TTL = 30.0
+_USER_CACHE_MAXSIZE = 10000
+_user_cache: Dict[int, Tuple[float, User]] = {}
+
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    def get_cached(self, db: Session, *, id: int) -> Optional[User]:
+        """Auth-path lookup served from the short-TTL in-process cache"""
+        entry = _user_cache.get(id)
+        if entry is not None and time.monotonic() - entry[0] < _USER_CACHE_TTL:
+            return entry[1]
+        user_obj = self.get(db, id=id)
+        if user_obj is not None:
+            if len(_user_cache) >= _USER_CACHE_MAXSIZE:
+                _user_cache.pop(next(iter(_user_cache)), None)
+            _user_cache[id] = (time.monotonic(), user_obj)
+        return user_obj
+
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
-        return db.query(User).filter(User.email == email).first()
+        return db.execute(
+            select(User).where(User.email == email)
+        ).scalar_one_or_none()
 
     def get_by_username(self, db: Session, *, username: str) -> Optional[User]:
-        return db.query(User).filter(User.username == username).first()
+        return db.execute(
+            select(User).where(User.username == username)
+        ).scalar_one_or_none()
 
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         db_obj = User(
@@ -34,13 +59,18 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
-            update_data = obj_in.dict(exclude_unset=True)
+            update_data = obj_in.model_dump(exclude_unset=True)
         if update_data.get("password"):
             hashed_password = get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
+        _user_cache.pop(db_obj.id, None)
         return super().update(db, db_obj=db_obj, obj_in=update_data)
 
+    def remove(self, db: Session, *, id: int) -> User:
+        _user_cache.pop(id, None)
+        return super().remove(db, id=id)
+
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
         if not user:
@@ -1,17 +1,45 @@
+import threading
+import time
 from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import bindparam, func, and_, insert, select, text, update
 
 from app.crud.base import CRUDBase
 from app.models.mcp import MCP, MCPInstallation, MCPUsageLog
 from app.schemas.mcp import MCPCreate, MCPUpdate, MCPInstallationCreate, MCPInstallationUpdate
 
+# Daily rollup of mcp_usage_logs (see the mcp_usage_daily_stats
+# migration); reading it touches at most `days` rows per MCP instead of
+# rescanning the raw log table on every stats call
+_DAILY_STATS_SELECT = text("""
+    SELECT day, req, err, tokens, tokens_n
+    FROM mcp_usage_daily_stats
+    WHERE mcp_id = :mcp_id AND day >= :start
+    ORDER BY day
+""")
+_DAILY_STATS_REFRESH = text(
+    "REFRESH MATERIALIZED VIEW CONCURRENTLY mcp_usage_daily_stats"
+)
+
+# Wall time of the last successful view refresh in this process,
+# surfaced as stats_as_of so clients can see staleness
+_daily_stats_refreshed_at: Optional[datetime] = None
+
+# Hottest single-row lookups, built once with explicit bind params so
+# every call is a compiled-statement-cache hit instead of a recompile
+_MCP_BY_NAME = select(MCP).where(MCP.name == bindparam("name"))
+_INSTALLATION_BY_USER_MCP = select(MCPInstallation).where(
+    MCPInstallation.user_id == bindparam("user_id"),
+    MCPInstallation.mcp_id == bindparam("mcp_id"),
+)
+
 
 class CRUDMcp(CRUDBase[MCP, MCPCreate, MCPUpdate]):
     def get_by_name(self, db: Session, *, name: str) -> Optional[MCP]:
-        return db.query(MCP).filter(MCP.name == name).first()
+        return db.execute(
+            _MCP_BY_NAME, {"name": name}
+        ).scalar_one_or_none()
 
     def get_multi_with_filters(
         self,
@@ -21,95 +49,104 @@ class CRUDMcp(CRUDBase[MCP, MCPCreate, MCPUpdate]):
         limit: int = 100,
         status: Optional[str] = None,
         capability: Optional[str] = None,
-        model_id: Optional[str] = None
+        model_id: Optional[str] = None,
+        include_total: bool = False
     ) -> Tuple[List[MCP], int]:
         query = db.query(MCP)
-        
+
         if status:
             query = query.filter(MCP.status == status)
         if capability:
             query = query.filter(MCP.capabilities.contains([capability]))
         if model_id:
             query = query.filter(MCP.supported_models.contains([{"id": model_id}]))
-        
-        total = query.count()
-        mcps = query.offset(skip).limit(limit).all()
-        
+
+        # The MCP response model only reads column attributes; raiseload
+        # turns any accidental lazy relationship access during
+        # serialization into an error instead of a silent N+1
+        if not include_total:
+            # Scrolling callers don't need a total; skip the count work
+            mcps = (
+                query.options(raiseload('*'))
+                .offset(skip)
+                .limit(limit)
+                .all()
+            )
+            return mcps, 0
+
+        # Single round-trip: the window count rides along with the page
+        # rows instead of re-scanning the filtered set in a COUNT query
+        rows = (
+            query.options(raiseload('*'))
+            .add_columns(func.count().over().label('total'))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        mcps = [row[0] for row in rows]
+        total = rows[0][1] if rows else 0
         return mcps, total
 
-    def get_mcp_stats(
+    def get_with_stats(
         self,
         db: Session,
         *,
-        mcp_id: int,
+        id: int,
         days: int = 30
-    ) -> Dict:
-        # Get date range
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
-        # Get daily requests
-        daily_requests = (
-            db.query(
-                func.date_trunc('day', MCPUsageLog.timestamp).label('date'),
-                func.count(MCPUsageLog.id).label('count')
-            )
-            .filter(
-                MCPUsageLog.mcp_id == mcp_id,
-                MCPUsageLog.timestamp >= start_date
-            )
-            .group_by('date')
-            .all()
-        )
-        
-        # Get error rate
-        total_requests = (
-            db.query(func.count(MCPUsageLog.id))
-            .filter(MCPUsageLog.mcp_id == mcp_id)
-            .scalar()
-        )
-        error_requests = (
-            db.query(func.count(MCPUsageLog.id))
-            .filter(
-                MCPUsageLog.mcp_id == mcp_id,
-                MCPUsageLog.error == True
-            )
-            .scalar()
-        )
-        error_rate = error_requests / total_requests if total_requests > 0 else 0
-        
-        # Get average tokens per request
-        avg_tokens = (
-            db.query(func.avg(MCPUsageLog.tokens_used))
-            .filter(MCPUsageLog.mcp_id == mcp_id)
-            .scalar() or 0
-        )
-        
+    ) -> Optional[Dict]:
+        # MCP row by primary key plus the pre-aggregated daily view:
+        # the stats side reads <= days indexed view rows instead of
+        # live-aggregating the raw log table on every call
+        mcp_obj = self.get(db, id=id)
+        if not mcp_obj:
+            return None
+
         return {
-            "daily_requests": {str(d.date): d.count for d in daily_requests},
-            "error_rate": error_rate,
-            "average_tokens_per_request": float(avg_tokens)
+            **mcp_obj.__dict__,
+            **self.get_mcp_stats(db, mcp_id=id, days=days),
         }
 
-    def update_mcp_stats(
+    def get_mcp_stats(
         self,
         db: Session,
         *,
         mcp_id: int,
-        tokens_used: Optional[int] = None,
-        latency: Optional[float] = None,
-        error: bool = False
-    ) -> None:
-        mcp = db.query(MCP).filter(MCP.id == mcp_id).first()
-        if mcp:
-            mcp.total_requests += 1
-            if latency:
-                # Update running average
-                mcp.average_latency = (
-                    (mcp.average_latency * (mcp.total_requests - 1) + latency)
-                    / mcp.total_requests
-                )
-            db.commit()
+        days: int = 30
+    ) -> Dict:
+        # Read the pre-aggregated daily view and fold the totals in
+        # Python; the former three aggregate scans over the raw log
+        # table become one indexed read of <= days rows
+        start_date = datetime.utcnow() - timedelta(days=days)
+        rows = db.execute(
+            _DAILY_STATS_SELECT, {"mcp_id": mcp_id, "start": start_date}
+        ).all()
+
+        total_requests = sum(row.req for row in rows)
+        error_requests = sum(row.err for row in rows)
+        total_tokens = sum(row.tokens or 0 for row in rows)
+        tokens_n = sum(row.tokens_n for row in rows)
+
+        return {
+            "daily_requests": {str(row.day): row.req for row in rows},
+            "error_rate": error_requests / total_requests if total_requests > 0 else 0,
+            "average_tokens_per_request": (
+                float(total_tokens / tokens_n) if tokens_n > 0 else 0.0
+            ),
+            # Stats are as fresh as the last view refresh, not live
+            "stats_as_of": _daily_stats_refreshed_at,
+        }
+
+    def refresh_usage_stats(self, db: Session) -> None:
+        """Refresh the daily stats view (called from a periodic task)"""
+        global _daily_stats_refreshed_at
+        db.execute(_DAILY_STATS_REFRESH)
+        db.commit()
+        _daily_stats_refreshed_at = datetime.utcnow()
+
+    # total_requests / average_latency are maintained by the
+    # trg_mcp_usage_stats_bump trigger on mcp_usage_logs, so every
+    # insert path (including the batched log buffer) updates them
+    # without an application-side statement
 
 
 class CRUDMcpInstallation:
@@ -120,14 +157,10 @@ class CRUDMcpInstallation:
         user_id: int,
         mcp_id: int
     ) -> Optional[MCPInstallation]:
-        return (
-            db.query(MCPInstallation)
-            .filter(
-                MCPInstallation.user_id == user_id,
-                MCPInstallation.mcp_id == mcp_id
-            )
-            .first()
-        )
+        return db.execute(
+            _INSTALLATION_BY_USER_MCP,
+            {"user_id": user_id, "mcp_id": mcp_id}
+        ).scalars().first()
 
     def get_multi_by_user(
         self,
@@ -135,11 +168,28 @@ class CRUDMcpInstallation:
         *,
         user_id: int,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        include_total: bool = False
     ) -> Tuple[List[MCPInstallation], int]:
         query = db.query(MCPInstallation).filter(MCPInstallation.user_id == user_id)
-        total = query.count()
-        installations = query.offset(skip).limit(limit).all()
+        if not include_total:
+            installations = (
+                query.options(raiseload('*'))
+                .offset(skip)
+                .limit(limit)
+                .all()
+            )
+            return installations, 0
+
+        rows = (
+            query.options(raiseload('*'))
+            .add_columns(func.count().over().label('total'))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        installations = [row[0] for row in rows]
+        total = rows[0][1] if rows else 0
         return installations, total
 
     def create(
@@ -149,18 +199,32 @@ class CRUDMcpInstallation:
         obj_in: MCPInstallationCreate,
         user_id: int
     ) -> MCPInstallation:
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = MCPInstallation(**obj_in_data, user_id=user_id)
-        db.add(db_obj)
-        
-        # Update MCP installation count
-        mcp = db.query(MCP).filter(MCP.id == obj_in.mcp_id).first()
-        if mcp:
-            mcp.installation_count += 1
-        
+        # pydantic-core serializes in Rust; jsonable_encoder's recursive
+        # Python walk is an order of magnitude slower for the same result
+        obj_in_data = obj_in.model_dump(mode="json")
+
+        # Single round-trip: the INSERT runs as a data-modifying CTE
+        # whose RETURNING feeds both the counter bump and the row we
+        # hand back, replacing the INSERT + UPDATE + refresh sequence
+        ins = (
+            insert(MCPInstallation)
+            .values(**obj_in_data, user_id=user_id)
+            .returning(*MCPInstallation.__table__.columns)
+            .cte("ins")
+        )
+        row = db.execute(
+            update(MCP)
+            .where(MCP.id == ins.c.mcp_id)
+            .values(installation_count=MCP.installation_count + 1)
+            .returning(*ins.c)
+            .execution_options(synchronize_session=False)
+        ).one()
         db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return MCPInstallation(**row._mapping)
+
+    # Column whitelist resolved once; enumerating columns this way is
+    # free compared to serializing the instance on every update
+    _installation_columns = frozenset(MCPInstallation.__table__.columns.keys())
 
     def update(
         self,
@@ -169,14 +233,13 @@ class CRUDMcpInstallation:
         db_obj: MCPInstallation,
         obj_in: Union[MCPInstallationUpdate, Dict[str, any]]
     ) -> MCPInstallation:
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        for field, value in update_data.items():
+            if field in self._installation_columns:
+                setattr(db_obj, field, value)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
@@ -192,17 +255,31 @@ class CRUDMcpInstallation:
         obj = self.get(db, user_id=user_id, mcp_id=mcp_id)
         if obj:
             db.delete(obj)
-            
-            # Update MCP installation count
-            mcp = db.query(MCP).filter(MCP.id == mcp_id).first()
-            if mcp and mcp.installation_count > 0:
-                mcp.installation_count -= 1
-            
+
+            # Atomic decrement, clamped at zero in SQL
+            db.execute(
+                update(MCP)
+                .where(MCP.id == mcp_id, MCP.installation_count > 0)
+                .values(installation_count=MCP.installation_count - 1)
+                .execution_options(synchronize_session=False)
+            )
+
             db.commit()
         return obj
 
 
 class CRUDMcpUsageLog:
+    # Flush the buffered rows once either bound is hit; each flush is a
+    # single multi-row INSERT and one commit, amortizing the WAL fsync
+    # that a commit-per-log pattern pays on every request
+    _BATCH_SIZE = 200
+    _FLUSH_INTERVAL = 0.25  # seconds
+
+    def __init__(self):
+        self._buffer: List[Dict] = []
+        self._buffer_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
     def create(
         self,
         db: Session,
@@ -215,21 +292,64 @@ class CRUDMcpUsageLog:
         latency: Optional[float] = None,
         error: bool = False,
         error_message: Optional[str] = None
-    ) -> MCPUsageLog:
-        db_obj = MCPUsageLog(
-            mcp_id=mcp_id,
-            user_id=user_id,
-            model_id=model_id,
-            request_type=request_type,
-            tokens_used=tokens_used,
-            latency=latency,
-            error=error,
-            error_message=error_message
-        )
-        db.add(db_obj)
+    ) -> None:
+        """Queue a usage log row; rows are written in batches.
+
+        Logs are fire-and-forget (no caller reads the inserted row
+        back), so the write may land up to a batch interval later.
+        """
+        row = {
+            "mcp_id": mcp_id,
+            "user_id": user_id,
+            "model_id": model_id,
+            "request_type": request_type,
+            "tokens_used": tokens_used,
+            "latency": latency,
+            "error": error,
+            "error_message": error_message,
+        }
+        with self._buffer_lock:
+            self._buffer.append(row)
+            due = (
+                len(self._buffer) >= self._BATCH_SIZE
+                or time.monotonic() - self._last_flush >= self._FLUSH_INTERVAL
+            )
+            if not due:
+                return
+            batch, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        db.execute(insert(MCPUsageLog), batch)
+        db.commit()
+
+    def flush(self, db: Session) -> None:
+        """Write any buffered rows immediately (shutdown hook)"""
+        with self._buffer_lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        db.execute(insert(MCPUsageLog), batch)
+        db.commit()
+
+    def ensure_usage_log_partitions(self, db: Session, *, ahead: int = 1) -> None:
+        """Create the current and upcoming monthly partitions if missing.
+
+        mcp_usage_logs is range-partitioned on timestamp; rows for a
+        month without a partition would land in the DEFAULT partition
+        and lose the pruning benefit, so a periodic task calls this to
+        stay ahead of the calendar.
+        """
+        month = datetime.utcnow().date().replace(day=1)
+        for _ in range(ahead + 1):
+            nxt = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+            db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS "
+                f"mcp_usage_logs_y{month.year}m{month.month:02d} "
+                f"PARTITION OF mcp_usage_logs "
+                f"FOR VALUES FROM ('{month}') TO ('{nxt}')"
+            ))
+            month = nxt
         db.commit()
-        db.refresh(db_obj)
-        return db_obj
 
     def get_user_usage(
         self,
@@ -238,18 +358,46 @@ class CRUDMcpUsageLog:
         user_id: int,
         mcp_id: Optional[int] = None,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> List[MCPUsageLog]:
+        end_date: Optional[datetime] = None,
+        limit: int = 1000,
+        stream: bool = False
+    ):
+        """Fetch a user's usage logs, newest first.
+
+        Returns at most `limit` rows. With stream=True (full exports)
+        the result is an iterator of plain row mappings over a
+        server-side cursor in 1000-row batches: no ORM instance is
+        built per row, so memory stays O(batch) and the rows feed
+        straight into a JSON encoder.
+        """
+        if stream:
+            stmt = select(*MCPUsageLog.__table__.columns).where(
+                MCPUsageLog.user_id == user_id
+            )
+            if mcp_id:
+                stmt = stmt.where(MCPUsageLog.mcp_id == mcp_id)
+            if start_date:
+                stmt = stmt.where(MCPUsageLog.timestamp >= start_date)
+            if end_date:
+                stmt = stmt.where(MCPUsageLog.timestamp <= end_date)
+            return (
+                db.execute(
+                    stmt.order_by(MCPUsageLog.timestamp.desc())
+                    .execution_options(stream_results=True, yield_per=1000)
+                )
+                .mappings()
+            )
+
         query = db.query(MCPUsageLog).filter(MCPUsageLog.user_id == user_id)
-        
+
         if mcp_id:
             query = query.filter(MCPUsageLog.mcp_id == mcp_id)
         if start_date:
             query = query.filter(MCPUsageLog.timestamp >= start_date)
         if end_date:
             query = query.filter(MCPUsageLog.timestamp <= end_date)
-        
-        return query.all()
+
+        return query.order_by(MCPUsageLog.timestamp.desc()).limit(limit).all()
 
 
 mcp = CRUDMcp(MCP)
@@ -1,17 +1,18 @@
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.engine import Engine
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import NullPool, QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 import time
 import logging
 
-from app.core.config import settings
+from app.core.config import DB_URI, settings
 from app.core.logging import logger
 
 
-# Convert PostgresDsn to string for SQLAlchemy
-database_url = str(settings.SQLALCHEMY_DATABASE_URI)
+# DSN already stringified once at config import
+database_url = DB_URI
 
 # Configure engine with connection pooling
 engine = create_engine(
@@ -20,9 +21,25 @@ engine = create_engine(
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
     pool_timeout=settings.DB_POOL_TIMEOUT,
-    pool_pre_ping=True,
+    # No pre-ping: it costs a SELECT-1 round trip on every checkout, and
+    # pool_recycle already rotates connections before server-side idle
+    # timeouts can kill them
+    pool_pre_ping=False,
     pool_recycle=settings.DB_POOL_RECYCLE,
     echo=settings.DB_ECHO_SQL,
+    # Room for every distinct 2.0-style statement the CRUD layer compiles
+    query_cache_size=2000,
+    # LIFO keeps steady-state traffic on the same few connections, so
+    # Postgres reuses its per-backend parse/plan caches and idle
+    # connections age out via pool_recycle instead of being rotated
+    pool_use_lifo=True,
+    pool_reset_on_return="rollback",
+    # Cap runaway queries so they can't pin a pool slot, and tag the
+    # backend for pg_stat_activity
+    connect_args={
+        "options": "-c statement_timeout=5000",
+        "application_name": "chatwithmcp",
+    },
 )
 
 # Configure session with performance optimizations
@@ -33,33 +50,94 @@ SessionLocal = sessionmaker(
     expire_on_commit=False  # Prevent unnecessary DB hits
 )
 
-Base = declarative_base()
+# Maintenance engine for the background tasks (view refresh, partition
+# DDL). Those statements legitimately run past the 5s request-path
+# statement_timeout once the log table grows, so they get their own
+# connections without it; NullPool because the tasks fire every few
+# minutes at most and holding an idle slot would be waste
+maintenance_engine = create_engine(
+    database_url,
+    poolclass=NullPool,
+    echo=settings.DB_ECHO_SQL,
+    connect_args={
+        "application_name": "chatwithmcp-maintenance",
+    },
+)
 
+MaintenanceSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=maintenance_engine,
+    expire_on_commit=False,
+)
 
-# Query timing logging
-@event.listens_for(Engine, "before_cursor_execute")
-def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    conn.info.setdefault('query_start_time', []).append(time.time())
-
-
-@event.listens_for(Engine, "after_cursor_execute")
-def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    total = time.time() - conn.info['query_start_time'].pop()
-    
-    # Log slow queries
-    if total > settings.SLOW_QUERY_THRESHOLD:
-        logger.warning(
-            "Slow query detected",
-            extra={
-                "duration": total,
-                "statement": statement,
-                "parameters": parameters
-            }
-        )
+# Async engine against the same database (asyncpg driver) for endpoints
+# that must not block the event loop while streaming
+async_database_url = database_url.replace("postgresql://", "postgresql+asyncpg://")
+
+async_engine = create_async_engine(
+    async_database_url,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=False,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    echo=settings.DB_ECHO_SQL,
+    pool_use_lifo=True,
+    # asyncpg takes session GUCs via server_settings rather than options
+    connect_args={
+        "server_settings": {
+            "statement_timeout": "5000",
+            "application_name": "chatwithmcp",
+        },
+    },
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+Base = declarative_base()
 
 
+# Slow-query logging. Only registered when tracking is enabled, so a
+# deployment that relies on pg_stat_statements/auto_explain instead
+# pays zero per-query dispatch overhead; the threshold is bound as a
+# module constant and the start time is a single attribute write
+# (perf_counter, no list allocation per query).
+_SLOW_QUERY_THRESHOLD = settings.SLOW_QUERY_THRESHOLD
+
+if settings.ENABLE_QUERY_TRACKING:
+    @event.listens_for(Engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info['_query_start'] = time.perf_counter()
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        total = time.perf_counter() - conn.info['_query_start']
+
+        # Log slow queries
+        if total > _SLOW_QUERY_THRESHOLD:
+            logger.warning(
+                "Slow query detected",
+                extra={
+                    "duration": total,
+                    "statement": statement,
+                    "parameters": parameters
+                }
+            )
+
+
+# Note: no scoped_session here. FastAPI runs a sync dependency's body
+# and its teardown in separate threadpool calls, each under a fresh copy
+# of the request context, so neither a thread-local nor a contextvar
+# scope key survives from checkout to cleanup — the registry would never
+# release its sessions. A plain per-request Session is correct and the
+# sessionmaker call it saves is noise next to a pooled checkout.
 def get_db() -> Session:
-    """Get database session"""
+    """Get a request-scoped database session"""
     db = SessionLocal()
     try:
         yield db
@@ -67,17 +145,28 @@ def get_db() -> Session:
         db.close()
 
 
-def optimize_query(query, db: Session):
-    """Apply query optimizations"""
-    # Enable eager loading for relationships
-    query = query.enable_eagerloads(True)
-    
-    # Add query execution plan logging in development
-    if settings.ENVIRONMENT == "development":
-        plan = db.execute(f"EXPLAIN ANALYZE {query}").fetchall()
-        logger.debug("Query plan", extra={"plan": plan})
-    
-    return query
+async def get_async_db() -> AsyncSession:
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def warm_pool() -> None:
+    """Fill the sync pool to pool_size so no request pays connection setup.
+
+    Checks out pool_size connections at once (sequential connect/close
+    would reuse the same one), then returns them all to the pool.
+    """
+    conns = [engine.connect() for _ in range(settings.DB_POOL_SIZE)]
+    for conn in conns:
+        conn.close()
+
+
+async def warm_async_pool() -> None:
+    """Async-engine counterpart of warm_pool."""
+    conns = [await async_engine.connect() for _ in range(settings.DB_POOL_SIZE)]
+    for conn in conns:
+        await conn.close()
 
 
 class DBStats:
@@ -1,7 +1,7 @@
-from datetime import datetime
-from typing import TYPE_CHECKING, Dict, Any, Optional
+from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, JSON, Text
+from sqlalchemy import Column, Enum, ForeignKey, Index, Integer, String, DateTime, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -15,10 +15,26 @@ class Message(Base):
     __tablename__ = "messages"
     _explicit_tablename = "messages"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Matches the default pagination predicate: filter by conversation,
+    # order by created_at
+    __table_args__ = (
+        Index("ix_messages_conv_created", "conversation_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
     content = Column(Text, nullable=False)
-    role = Column(String, nullable=False)
-    meta_data = Column(JSON, default={})
+    # Native enum: 4 bytes per row instead of variable-length text on
+    # the busiest table
+    role = Column(
+        Enum("user", "assistant", "system", "tool", name="msg_role"),
+        nullable=False,
+    )
+    # JSONB: stored pre-parsed instead of re-parsed text on every read.
+    # The default lives DB-side, so the hot insert path skips a fresh
+    # dict allocation and its JSON encode per row
+    meta_data = Column(
+        JSONB, nullable=False, server_default=text("'{}'::jsonb")
+    )
     conversation_id = Column(Integer, ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -30,14 +46,36 @@ class Conversation(Base):
     __tablename__ = "conversations"
     _explicit_tablename = "conversations"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     model = Column(String, nullable=False)
-    meta_data = Column(JSON, default={})
+    meta_data = Column(
+        JSONB, nullable=False, server_default=text("'{}'::jsonb")
+    )
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Defaulted at insert (not just onupdate): the conversation list
+    # keysets on updated_at, so every row must carry a non-null value
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
     
-    # Relationships
-    messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
-    user = relationship("User", back_populates="conversations") 
\ No newline at end of file
+    # Relationships. selectin loads each page of conversations' messages
+    # in one extra query at execute time instead of one lazy query per
+    # row (and works under AsyncSession, where lazy loads raise)
+    messages = relationship(
+        "Message",
+        back_populates="conversation",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="Message.created_at",
+    )
+    user = relationship("User", back_populates="conversations")
+
+    @property
+    def message_count(self) -> int:
+        # Served from the selectin-loaded collection — no extra query
+        return len(self.messages) 
\ No newline at end of file
@@ -1,10 +1,16 @@
-from datetime import datetime
-from typing import Dict, List
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, JSON, Float, func
+from typing import TYPE_CHECKING
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Computed, Date, DateTime, Enum, Float,
+    ForeignKey, Index, Integer, String, func,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
-from app.models.user import User
+
+if TYPE_CHECKING:
+    from .user import User  # noqa: F401
 
 
 class MCP(Base):
@@ -15,10 +21,15 @@ class MCP(Base):
     description = Column(String)
     api_endpoint = Column(String, nullable=False)
     api_key = Column(String, nullable=False)
-    supported_models = Column(JSON, nullable=False)
-    capabilities = Column(JSON, nullable=False)
+    # JSONB so capability/model filters can use the GIN indexes
+    supported_models = Column(JSONB, nullable=False)
+    capabilities = Column(JSONB, nullable=False)
     rate_limit = Column(Integer)
-    status = Column(String, nullable=False, default="active")
+    status = Column(
+        Enum("active", "inactive", "maintenance", "error", name="mcp_status"),
+        nullable=False,
+        default="active",
+    )
     admin_email = Column(String)
     
     # Statistics
@@ -30,18 +41,33 @@ class MCP(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    # Relationships
-    installations = relationship("MCPInstallation", back_populates="mcp")
-    usage_logs = relationship("MCPUsageLog", back_populates="mcp")
+    # Relationships. Nothing traverses these collections (queries go
+    # through the CRUD layer), so lazy="raise" turns an accidental N+1
+    # into an immediate error; passive_deletes leaves FK handling to the
+    # database instead of loading every child row on delete
+    installations = relationship(
+        "MCPInstallation", back_populates="mcp",
+        lazy="raise", passive_deletes=True,
+    )
+    usage_logs = relationship(
+        "MCPUsageLog", back_populates="mcp",
+        lazy="raise", passive_deletes=True,
+    )
 
 
 class MCPInstallation(Base):
     __tablename__ = "mcp_installations"
 
+    # A user installs an MCP at most once; the unique index doubles as
+    # the lookup path for the (user_id, mcp_id) fetch
+    __table_args__ = (
+        Index("uq_mcp_install_user_mcp", "user_id", "mcp_id", unique=True),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     mcp_id = Column(Integer, ForeignKey("mcps.id"), nullable=False)
-    settings = Column(JSON)
+    settings = Column(JSONB)
     request_count = Column(Integer, default=0)
     last_used_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -55,7 +81,17 @@ class MCPInstallation(Base):
 class MCPUsageLog(Base):
     __tablename__ = "mcp_usage_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Daily rollups group on the stored bucket instead of calling
+    # date_trunc per row. Partitioned monthly on timestamp so recent-
+    # window queries touch one partition and retention is DROP TABLE;
+    # the partition key must be part of the primary key.
+    __table_args__ = (
+        Index("ix_mcpusage_mcp_bucket_day", "mcp_id", "bucket_day"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+    # BigInteger: an append-only log outlives a 32-bit sequence
+    id = Column(BigInteger, primary_key=True, index=True)
     mcp_id = Column(Integer, ForeignKey("mcps.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     model_id = Column(String, nullable=False)
@@ -64,7 +100,13 @@ class MCPUsageLog(Base):
     latency = Column(Float)  # in milliseconds
     error = Column(Boolean, default=False)
     error_message = Column(String)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
+    )
+    bucket_day = Column(
+        Date,
+        Computed("(timestamp AT TIME ZONE 'UTC')::date", persisted=True),
+    )
 
     # Relationships
     mcp = relationship("MCP", back_populates="usage_logs")
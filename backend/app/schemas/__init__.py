@@ -12,10 +12,24 @@ from .conversation import (
 )
 from .msg import Msg
 from .mcp import (
+    MCP,
+    MCPInstallation,
     MCPServer,
     MCPServerCreate,
     MCPServerUpdate,
     MCPServerInDB,
     MCPServerStats,
     MCPServerHealth,
-) 
\ No newline at end of file
+)
+
+from typing import List
+
+from pydantic import TypeAdapter
+
+# List adapters built once at import. Building a TypeAdapter compiles a
+# pydantic-core validator/serializer; reusing these warm instances keeps
+# that cost out of every list response.
+MessageListAdapter = TypeAdapter(List[Message])
+ConversationListAdapter = TypeAdapter(List[Conversation])
+MCPListAdapter = TypeAdapter(List[MCP])
+MCPInstallationListAdapter = TypeAdapter(List[MCPInstallation])
@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class MessageBase(BaseModel):
@@ -22,8 +22,7 @@ class Message(MessageBase):
     conversation_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 
 class MessageInDB(Message):
@@ -45,13 +44,15 @@ class ConversationUpdate(ConversationBase):
 
 
 class Conversation(ConversationBase):
-    id: Union[int, str] 
+    id: Union[int, str]
     created_at: datetime
     updated_at: Optional[datetime] = None
     messages: List[Message] = []
+    # Filled from the ORM property; clients paginating the list can show
+    # counts without touching the messages payload
+    message_count: int = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
 
 class ConversationInDB(Conversation):
@@ -59,17 +60,21 @@ class ConversationInDB(Conversation):
 
 
 class ConversationPagination(BaseModel):
-    total: int
+    # total is None on keyset (cursor) pages, where it is never shown
+    # and would cost a COUNT(*) per request
+    total: Optional[int] = None
     items: List[Conversation]
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 
 class MessagePagination(BaseModel):
-    total: int
+    total: Optional[int] = None
     items: List[Message]
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 
 class StreamResponse(BaseModel):
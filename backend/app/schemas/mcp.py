@@ -1,7 +1,8 @@
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from pydantic import BaseModel, HttpUrl, constr, validator
+from pydantic import BaseModel, ConfigDict, HttpUrl, TypeAdapter, constr
 from enum import Enum
+from typing_extensions import TypedDict
 
 
 class MCPStatus(str, Enum):
@@ -28,11 +29,34 @@ class MCPModelInfo(BaseModel):
     pricing: Optional[Dict[str, float]] = None
 
 
-class MCPBase(BaseModel):
+# TypedDict variant for the supported_models payload: pydantic-core
+# validates it without instantiating a model object per entry, so a
+# fetched MCP allocates plain dicts instead of N BaseModel instances
+class MCPModelInfoTD(TypedDict, total=False):
+    id: str
     name: str
+    capabilities: List[MCPCapability]
+    parameters: Dict[str, Dict]
+    max_tokens: Optional[int]
+    pricing: Optional[Dict[str, float]]
+
+
+MCPModelsAdapter = TypeAdapter(List[MCPModelInfoTD])
+
+
+# Shared root for the MCP and MCPServer families: the common field and
+# config live in one class, so pydantic-core builds them once instead of
+# per family
+class _MCPCommon(BaseModel):
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
+
+    name: str
+
+
+class MCPBase(_MCPCommon):
     description: str
     api_endpoint: HttpUrl
-    supported_models: List[MCPModelInfo]
+    supported_models: List[MCPModelInfoTD]
     capabilities: List[MCPCapability]
     rate_limit: Optional[int] = None  # Requests per minute
     status: MCPStatus = MCPStatus.ACTIVE
@@ -48,7 +72,7 @@ class MCPUpdate(BaseModel):
     description: Optional[str] = None
     api_endpoint: Optional[HttpUrl] = None
     api_key: Optional[str] = None
-    supported_models: Optional[List[MCPModelInfo]] = None
+    supported_models: Optional[List[MCPModelInfoTD]] = None
     capabilities: Optional[List[MCPCapability]] = None
     rate_limit: Optional[int] = None
     status: Optional[MCPStatus] = None
@@ -56,6 +80,7 @@ class MCPUpdate(BaseModel):
 
 
 class MCPInDBBase(MCPBase):
+    # from_attributes / defer_build inherited from _MCPCommon
     id: int
     created_at: datetime
     updated_at: datetime
@@ -63,9 +88,6 @@ class MCPInDBBase(MCPBase):
     total_requests: int = 0
     average_latency: float = 0.0
 
-    class Config:
-        from_attributes = True
-
 
 class MCP(MCPInDBBase):
     pass
@@ -75,6 +97,9 @@ class MCPWithStats(MCP):
     daily_requests: Dict[str, int]
     error_rate: float
     average_tokens_per_request: float
+    # Timestamp of the last mcp_usage_daily_stats refresh — the stats
+    # fields are as fresh as this, not live
+    stats_as_of: Optional[datetime] = None
 
 
 class MCPInstallationBase(BaseModel):
@@ -98,11 +123,19 @@ class MCPInstallation(MCPInstallationBase):
     last_used_at: Optional[datetime] = None
     request_count: int = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
+
+
+class MCPValidationRequest(BaseModel):
+    api_endpoint: str
+    api_key: str
 
 
 class MCPValidationResult(BaseModel):
+    # Only built when an admin validates an MCP; keep it off the
+    # cold-start path
+    model_config = ConfigDict(defer_build=True)
+
     is_valid: bool
     error_message: Optional[str] = None
     detected_models: Optional[List[MCPModelInfo]] = None
@@ -110,18 +143,15 @@ class MCPValidationResult(BaseModel):
     latency: float
 
 
-class MCPServerBase(BaseModel):
-    name: str
+class MCPServerBase(_MCPCommon):
     url: HttpUrl
     model: str
     metadata: Optional[Dict[str, Any]] = None
 
 
-class MCPServerCreate(MCPServerBase):
-    pass
-
-
 class MCPServerUpdate(MCPServerBase):
+    model_config = ConfigDict(extra="ignore")
+
     name: Optional[str] = None
     url: Optional[HttpUrl] = None
     model: Optional[str] = None
@@ -133,12 +163,11 @@ class MCPServer(MCPServerBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
 
-
-class MCPServerInDB(MCPServer):
-    pass
+# Pass-through subclasses added nothing but a second CoreSchema build;
+# plain aliases keep the public names without the duplicate cost
+MCPServerCreate = MCPServerBase
+MCPServerInDB = MCPServer
 
 
 class MCPServerStats(BaseModel):
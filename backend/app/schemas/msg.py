@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from dataclasses import dataclass
 
 
-class Msg(BaseModel):
-    msg: str 
\ No newline at end of file
+@dataclass(slots=True, frozen=True)
+class Msg:
+    msg: str
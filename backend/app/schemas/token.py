@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import Optional
 from pydantic import BaseModel
 
@@ -9,7 +10,11 @@ class Token(BaseModel):
     refresh_token: str
 
 
-class TokenPayload(BaseModel):
+# Internal-only payload built on every authenticated request; a frozen
+# slots dataclass skips the per-instance __dict__ and fields-set
+# bookkeeping a BaseModel carries
+@dataclass(slots=True, frozen=True)
+class TokenPayload:
     sub: Optional[str] = None
     exp: Optional[int] = None
 
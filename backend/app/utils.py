@@ -5,7 +5,7 @@ from typing import Any, Dict, Optional
 
 import emails
 from emails.template import JinjaTemplate
-from jose import jwt
+import jwt
 
 from app.core.config import settings
 
@@ -104,5 +104,5 @@ def verify_password_reset_token(token: str) -> Optional[str]:
     try:
         decoded_token = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
         return decoded_token["sub"]
-    except jwt.JWTError:
+    except jwt.PyJWTError:
         return None 
\ No newline at end of file